@@ -0,0 +1,129 @@
+import os
+import time
+import shutil
+import tempfile
+import contextlib
+import tracemalloc
+
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+from c4dstubs.signatures import Class, Constant, Function
+from c4dstubs.parsers import parse_file
+from c4dstubs.overrides import (
+    OverrideRegistry,
+    load_classes,
+    load_functions,
+)
+from c4dstubs.api import Module, module_name_from_file_path
+from c4dstubs.generator import convert_source
+
+
+def gather_files(src_directory: Path) -> List[Path]:
+    result: List[Path] = []
+
+    for root, _, filenames in os.walk(src_directory.joinpath("c4d")):
+        for filename in filenames:
+            result.append(Path(root).joinpath(filename))
+
+    return result
+
+
+def load_modules(
+    src_directory: Path, classes_file: Path, functions_file: Path
+) -> List[Tuple[Path, Module]]:
+    overrides = OverrideRegistry(
+        load_classes(classes_file), load_functions(functions_file)
+    )
+
+    result: List[Tuple[Path, Module]] = []
+
+    for file in gather_files(src_directory):
+        constants: List[Constant] = []
+        classes: List[Class] = []
+        functions: List[Function] = []
+
+        parse_file(
+            file,
+            constants,
+            classes,
+            functions,
+            overrides,
+            True,
+        )
+
+        module_instance = Module(
+            module_name_from_file_path(file, src_directory),
+            constants=constants,
+            classes=classes,
+            functions=functions,
+            is_init_file="__init__" in str(file),
+        )
+
+        result.append((file, module_instance))
+
+    return result
+
+
+def measure_time(function: Callable[[], object], repeat: int = 3) -> float:
+    # best of repeated runs in seconds
+    result = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+
+        function()
+
+        result = min(result, time.perf_counter() - start)
+
+    return result
+
+
+def measure_peak_memory(function: Callable[[], object]) -> int:
+    # peak of memory allocated while running in bytes
+    tracemalloc.start()
+
+    try:
+        function()
+
+        _, result = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result
+
+
+def run_conversion(
+    src_directory: Path,
+    classes_file: Optional[Path] = None,
+    functions_file: Optional[Path] = None,
+    streaming: bool = False,
+    jobs: int = 1,
+    writers: int = 1,
+    profile_file: Optional[Path] = None,
+) -> None:
+    # converts the package into an empty directory without any output
+    with tempfile.TemporaryDirectory() as directory:
+        destination_directory = Path(directory)
+
+        # work on copies since overrides are rewritten by the conversion
+        classes_copy = destination_directory.joinpath("classes.yaml")
+        functions_copy = destination_directory.joinpath("functions.yaml")
+
+        for file, copy in [
+            (classes_file, classes_copy),
+            (functions_file, functions_copy),
+        ]:
+            if file and file.is_file():
+                shutil.copyfile(file, copy)
+
+        with open(os.devnull, "w") as f, contextlib.redirect_stdout(f):
+            convert_source(
+                src_directory,
+                destination_directory,
+                classes_copy,
+                functions_copy,
+                jobs=jobs,
+                profile_file=profile_file,
+                streaming=streaming,
+                writers=writers,
+            )
@@ -0,0 +1,103 @@
+import ast
+import click
+
+from pathlib import Path
+from typing import List, Tuple
+from c4dstubs.docstrings import normalize_docstring, extract_fields
+from benchmarks.common import gather_files, measure_time
+
+Field = Tuple[str, str, str, int, str]
+
+
+def gather_docstrings(src_directory: Path) -> List[str]:
+    # raw docstrings of all functions and methods
+    result: List[str] = []
+
+    for file in gather_files(src_directory):
+        with open(file, "r") as f:
+            data = ast.parse(f.read())
+
+        for node in ast.walk(data):
+            if isinstance(node, ast.FunctionDef):
+                docstring = ast.get_docstring(node, clean=False)
+
+                if docstring:
+                    result.append(docstring)
+
+    return result
+
+
+def split_fields(docstring: str) -> List[Field]:
+    # the previous approach of parse_function, normalizing line by line
+    # and splitting every line at colons
+    normalized = ""
+
+    for docstring_line in docstring.split("\n"):
+        normalized += docstring_line.strip().replace("\\", "/") + "\n"
+
+    result: List[Field] = []
+
+    for index, docstring_line in enumerate(normalized.split("\n")):
+        hint_parts = list(
+            filter(bool, [x.strip() for x in docstring_line.split(":")])
+        )
+
+        if len(hint_parts) == 2:
+            for kind in ("type", "rtype", "param"):
+                if hint_parts[0].startswith(kind):
+                    name = ""
+
+                    if kind != "rtype":
+                        name = hint_parts[0].replace(f"{kind} ", "")
+
+                    result.append(
+                        (name, kind, hint_parts[1], index, docstring_line)
+                    )
+
+                    break
+
+    return result
+
+
+def match_fields(docstring: str) -> List[Field]:
+    return [
+        (x.name, x.kind, x.text, x.line, x.source)
+        for x in extract_fields(normalize_docstring(docstring))
+    ]
+
+
+@click.command(
+    help="Compare docstring field extraction approaches on the SOURCE dummy package."
+)
+@click.argument("source")
+@click.option("--repeat", default=5, help="Number of timed runs")
+def main(source: str, repeat: int) -> None:
+    docstrings = gather_docstrings(Path(source))
+
+    field_count = 0
+
+    for docstring in docstrings:
+        fields = split_fields(docstring)
+
+        if fields != match_fields(docstring):
+            raise Exception(f"Approaches disagree on '{docstring}'")
+
+        field_count += len(fields)
+
+    print(f"{len(docstrings)} docstrings, {field_count} fields")
+    print(f"{'method':<10}{'time [s]':>12}{'us/docstring':>14}")
+
+    for method_name, method in [
+        ("split", split_fields),
+        ("match", match_fields),
+    ]:
+        seconds = measure_time(lambda: [method(x) for x in docstrings], repeat)
+
+        print(
+            f"{method_name:<10}{seconds:>12.4f}"
+            f"{seconds / len(docstrings) * 1e6:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import random
+import click
+import yaml
+
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+from c4dstubs.signatures import Hint
+from c4dstubs.hints import parse_hint_string
+from benchmarks.common import measure_time
+
+# structure of a hint or the type of the error parsing it
+Result = Union[Tuple[Any, ...], str]
+
+# characters of fuzzed hints
+ALPHABET = "ab[], .\t"
+
+# unbalanced hints the previous approach accepted silently, they raise now
+KNOWN_DIFFERENCES = ["a[[][]", "a[[b][]", "a[b[][]", "a[,[][]"]
+
+
+def previous_parse_hint(hint_string: str) -> Hint:
+    # the previous approach of deserialize_hint, searching the outermost
+    # brackets and splitting their content recursively
+    hint_string = hint_string.strip()
+
+    hint_string = hint_string.strip(".")
+
+    opening_bracket_index = hint_string.find("[")
+    closing_bracket_index = hint_string[::-1].find("]")
+
+    if opening_bracket_index == -1 and closing_bracket_index == -1:
+        return Hint(hint_string)
+
+    if opening_bracket_index == -1 or closing_bracket_index == -1:
+        raise Exception(f"Missing bracket counterpart in '{hint_string}'")
+
+    start = opening_bracket_index + 1
+    stop = len(hint_string) - closing_bracket_index - 1
+
+    hint_substring = hint_string[start:stop]
+
+    hint_name_string = hint_string[: start - 1]
+
+    if " " in hint_name_string:
+        raise Exception(f"Illegal space in '{hint_string}'")
+
+    name = previous_parse_hint(hint_name_string).name
+    children: List[Hint] = []
+
+    nested_levels = 0
+
+    buffer = ""
+
+    for character in hint_substring:
+        if character == " ":
+            continue
+
+        if nested_levels == 0:
+            if character == ",":
+                children.append(previous_parse_hint(buffer))
+
+                buffer = ""
+
+                continue
+
+        if character == "[":
+            nested_levels += 1
+
+        if character == "]":
+            nested_levels = max(nested_levels - 1, 0)
+
+        buffer += character
+
+    if buffer:
+        children.append(previous_parse_hint(buffer))
+
+    return Hint(name, children)
+
+
+def hint_structure(hint_instance: Hint) -> Tuple[Any, ...]:
+    return (
+        hint_instance.name,
+        tuple(hint_structure(x) for x in hint_instance.children),
+    )
+
+
+def parse_result(method: Any, hint_string: str) -> Result:
+    try:
+        return hint_structure(method(hint_string))
+    except Exception as e:
+        return type(e).__name__
+
+
+def is_balanced(hint_string: str) -> bool:
+    depth = 0
+
+    for character in hint_string:
+        if character == "[":
+            depth += 1
+        elif character == "]":
+            depth -= 1
+
+            if depth < 0:
+                return False
+
+    return depth == 0
+
+
+def gather_override_hints(
+    classes_file: Path, functions_file: Path
+) -> List[str]:
+    # raw hints of the arguments and return values of the overrides
+    result: List[str] = []
+
+    def gather(data: Any) -> None:
+        if isinstance(data, dict):
+            for value in data.values():
+                gather(value)
+        elif isinstance(data, list):
+            for value in data:
+                gather(value)
+        elif isinstance(data, str):
+            name_hint = data.split("=")[0]
+
+            if ":" in name_hint:
+                result.append(name_hint.split(":", 1)[1])
+
+    for file in (classes_file, functions_file):
+        with open(file, "r") as f:
+            gather(yaml.safe_load(f))
+
+    return result
+
+
+def fuzz_hints(count: int, seed: int, length: int = 12) -> List[str]:
+    # random hints with balanced brackets
+    generator = random.Random(seed)
+
+    result: List[str] = []
+
+    while len(result) < count:
+        hint_string = "".join(
+            generator.choice(ALPHABET)
+            for _ in range(generator.randint(1, length))
+        )
+
+        if is_balanced(hint_string):
+            result.append(hint_string)
+
+    return result
+
+
+def compare(hints: List[str]) -> Optional[str]:
+    # first hint the approaches disagree on
+    for hint_string in hints:
+        if parse_result(previous_parse_hint, hint_string) != parse_result(
+            parse_hint_string, hint_string
+        ):
+            return hint_string
+
+    return None
+
+
+@click.command(
+    help="Compare the single pass hint parser with the previous approach on the hints of the CLASSES and FUNCTIONS overrides and on fuzzed hints."
+)
+@click.argument("classes")
+@click.argument("functions")
+@click.option("--count", default=100000, help="Number of fuzzed hints")
+@click.option("--seed", default=0, help="Seed of the fuzzed hints")
+@click.option("--repeat", default=5, help="Number of timed runs")
+def main(
+    classes: str, functions: str, count: int, seed: int, repeat: int
+) -> None:
+    override_hints = gather_override_hints(Path(classes), Path(functions))
+    fuzzed_hints = fuzz_hints(count, seed)
+
+    for name, hints in [
+        ("override", override_hints),
+        ("fuzzed", fuzzed_hints),
+    ]:
+        hint_string = compare(hints)
+
+        if hint_string is not None:
+            raise Exception(f"Approaches disagree on {hint_string!r}")
+
+        print(f"{len(hints)} {name} hints agree")
+
+    for hint_string in KNOWN_DIFFERENCES:
+        if isinstance(parse_result(previous_parse_hint, hint_string), str):
+            raise Exception(f"Previous approach raises on {hint_string!r}")
+
+        if not isinstance(parse_result(parse_hint_string, hint_string), str):
+            raise Exception(f"Unbalanced {hint_string!r} must raise")
+
+    print(f"{len(KNOWN_DIFFERENCES)} unbalanced hints raise")
+    print(f"{'method':<10}{'time [s]':>12}{'us/hint':>10}")
+
+    for method_name, method in [
+        ("previous", previous_parse_hint),
+        ("single", parse_hint_string),
+    ]:
+        seconds = measure_time(
+            lambda: [parse_result(method, x) for x in override_hints], repeat
+        )
+
+        print(
+            f"{method_name:<10}{seconds:>12.4f}"
+            f"{seconds / len(override_hints) * 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
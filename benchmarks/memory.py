@@ -0,0 +1,110 @@
+import gc
+import sys
+import resource
+import click
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from c4dstubs.signatures import Hint, Argument, Function, Class, Import, Module
+from benchmarks.common import load_modules, measure_peak_memory, run_conversion
+
+IR_TYPES = (Hint, Argument, Function, Class, Module, Import)
+
+
+def object_size(instance: object) -> int:
+    # shallow size including the instance dictionary if there is one
+    result = sys.getsizeof(instance)
+
+    if hasattr(instance, "__dict__"):
+        result += sys.getsizeof(instance.__dict__)
+
+    return result
+
+
+def measure_ir_objects() -> Dict[str, Tuple[int, int]]:
+    # number of live instances and their total size in bytes per type
+    result: Dict[str, Tuple[int, int]] = {x.__name__: (0, 0) for x in IR_TYPES}
+
+    for instance in gc.get_objects():
+        if isinstance(instance, IR_TYPES):
+            name = type(instance).__name__
+            count, size = result[name]
+
+            result[name] = (count + 1, size + object_size(instance))
+
+    return result
+
+
+def peak_rss() -> int:
+    # ru_maxrss is reported in kilobytes on linux and in bytes on macOS
+    result = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if sys.platform != "darwin":
+        result *= 1024
+
+    return result
+
+
+def measure_conversion_memory(
+    src_directory: Path,
+    classes_file: Optional[Path] = None,
+    functions_file: Optional[Path] = None,
+) -> Dict[str, int]:
+    # peak of memory allocated by a conversion per mode in bytes
+    result: Dict[str, int] = {}
+
+    for mode, streaming in [("batch", False), ("streaming", True)]:
+        gc.collect()
+
+        result[mode] = measure_peak_memory(
+            lambda: run_conversion(
+                src_directory, classes_file, functions_file, streaming
+            )
+        )
+
+    return result
+
+
+@click.command(
+    help="Report memory used by the parsed objects and by a full conversion of the SOURCE dummy package."
+)
+@click.argument("source")
+@click.argument("classes")
+@click.argument("functions")
+def main(source: str, classes: str, functions: str) -> None:
+    src_directory = Path(source)
+    classes_file = Path(classes)
+    functions_file = Path(functions)
+
+    # keep the parsed modules alive while objects are counted
+    modules = load_modules(src_directory, classes_file, functions_file)
+
+    gc.collect()
+
+    print(f"{'type':<12}{'objects':>12}{'bytes':>14}{'bytes/object':>16}")
+
+    for name, (count, size) in measure_ir_objects().items():
+        average = size / count if count else 0
+
+        print(f"{name:<12}{count:>12}{size:>14}{average:>16.1f}")
+
+    del modules
+
+    gc.collect()
+
+    peaks = measure_conversion_memory(
+        src_directory, classes_file, functions_file
+    )
+
+    print()
+
+    for mode, peak in peaks.items():
+        print(
+            f"Conversion peak, {mode} (tracemalloc): {peak / 2 ** 20:.1f} MiB"
+        )
+
+    print(f"Process peak RSS: {peak_rss() / 2 ** 20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
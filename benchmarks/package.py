@@ -0,0 +1,161 @@
+import random
+
+from pathlib import Path
+from typing import List
+
+# containers used to nest hints, the number is the count of their children
+CONTAINERS = [("List", 1), ("Optional", 1), ("Dict", 2), ("Tuple", 2)]
+
+BUILTINS = ["int", "float", "str", "bool"]
+
+PREFIXES = ["MSG", "ID", "DESC", "BFM", "OBJECT", "TAG", "MDATA", "PRIM"]
+
+
+class PackageGenerator:
+    # writes a synthetic dummy package in the format of the documentation
+    def __init__(
+        self,
+        modules: int = 10,
+        classes: int = 20,
+        methods: int = 10,
+        hint_lines: int = 3,
+        depth: int = 2,
+        constants: int = 5000,
+        seed: int = 0,
+    ) -> None:
+        self.modules = max(modules, 1)
+        self.classes = classes
+        self.methods = methods
+        self.hint_lines = hint_lines
+        self.depth = depth
+        self.constants = constants
+        self.random = random.Random(seed)
+
+        # the first module is the c4d package itself
+        self.module_names = ["c4d"] + [
+            f"c4d.module{x % 4}.submodule{x}" for x in range(1, self.modules)
+        ]
+
+        self.class_names = [
+            f"{x}.Class{index}_{y}"
+            for index, x in enumerate(self.module_names)
+            for y in range(self.classes)
+        ]
+
+    def hint(self, depth: int) -> str:
+        if depth <= 0 or self.random.random() < 0.3:
+            if self.class_names and self.random.random() < 0.5:
+                return self.random.choice(self.class_names)
+
+            return self.random.choice(BUILTINS)
+
+        name, count = self.random.choice(CONTAINERS)
+
+        children = ", ".join(self.hint(depth - 1) for _ in range(count))
+
+        return f"{name}[{children}]"
+
+    def function_lines(self, name: str, is_method: bool) -> List[str]:
+        argument_names = [f"argument{x}" for x in range(self.hint_lines)]
+
+        if is_method:
+            argument_names.insert(0, "self")
+
+        result = [
+            f"def {name}({', '.join(argument_names)}):",
+            '    """',
+            f"    {name} does something with its arguments.",
+            "",
+        ]
+
+        for argument_name in argument_names:
+            if argument_name == "self":
+                continue
+
+            optional = ", optional" if self.random.random() < 0.2 else ""
+
+            result.append(
+                f"    :type {argument_name}: {self.hint(self.depth)}"
+            )
+            result.append(
+                f"    :param {argument_name}: The {argument_name}{optional}."
+            )
+
+        result.extend(
+            [
+                f"    :rtype: {self.hint(self.depth)}",
+                "    :return: The result.",
+                '    """',
+                "    pass",
+                "",
+            ]
+        )
+
+        return result
+
+    def module_source(self, index: int) -> str:
+        lines: List[str] = []
+
+        class_names = self.class_names[
+            index * self.classes : (index + 1) * self.classes
+        ]
+
+        for class_name in class_names:
+            base = "object"
+
+            if self.random.random() < 0.5:
+                base = self.random.choice(self.class_names).split(".")[-1]
+
+            lines.append(f"class {class_name.split('.')[-1]}({base}):")
+
+            for method_index in range(self.methods):
+                lines.extend(
+                    "    " + x if x else x
+                    for x in self.function_lines(f"Method{method_index}", True)
+                )
+
+            if not self.methods:
+                lines.append("    pass")
+
+            lines.append("")
+
+        for function_index in range(self.methods):
+            lines.extend(
+                self.function_lines(f"Function{function_index}", False)
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def symbols_source(self) -> str:
+        lines = [
+            f"{self.random.choice(PREFIXES)}_CONSTANT_{x} = {x}"
+            for x in range(self.constants)
+        ]
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, src_directory: Path) -> None:
+        for index, module_name in enumerate(self.module_names):
+            module_directory = src_directory.joinpath(*module_name.split("."))
+            module_directory.mkdir(parents=True, exist_ok=True)
+
+            module_directory.joinpath("__init__.py").write_text(
+                self.module_source(index)
+            )
+
+        # empty packages between c4d and the submodules
+        for module_name in self.module_names:
+            parts = module_name.split(".")
+
+            for length in range(2, len(parts)):
+                init_file = src_directory.joinpath(*parts[:length]).joinpath(
+                    "__init__.py"
+                )
+
+                if not init_file.is_file():
+                    init_file.write_text("")
+
+        if self.constants:
+            src_directory.joinpath("c4d", "symbols.py").write_text(
+                self.symbols_source()
+            )
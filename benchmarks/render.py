@@ -0,0 +1,56 @@
+import os
+import click
+
+from pathlib import Path
+from c4dstubs.generator import Module
+from benchmarks.common import load_modules, measure_time, measure_peak_memory
+
+
+def render_to_string(module_instance: Module) -> None:
+    with open(os.devnull, "w") as f:
+        f.write(module_instance.render())
+
+
+def render_to_stream(module_instance: Module) -> None:
+    from c4dstubs.signatures import Writer
+
+    with open(os.devnull, "w") as f:
+        module_instance.write(Writer(f))
+
+
+@click.command(
+    help="Measure render time and peak memory of the largest modules of the SOURCE dummy package."
+)
+@click.argument("source")
+@click.argument("classes")
+@click.argument("functions")
+@click.option("--count", default=3, help="Number of modules to measure")
+@click.option("--repeat", default=3, help="Number of timed runs per module")
+def main(
+    source: str, classes: str, functions: str, count: int, repeat: int
+) -> None:
+    modules = load_modules(Path(source), Path(classes), Path(functions))
+
+    # largest source files first
+    modules.sort(key=lambda x: x[0].stat().st_size, reverse=True)
+
+    methods = [("string", render_to_string)]
+
+    if hasattr(Module, "write"):
+        methods.append(("stream", render_to_stream))
+
+    print(f"{'module':<30}{'method':<10}{'time [s]':>12}{'peak [KiB]':>14}")
+
+    for _, module_instance in modules[:count]:
+        for method_name, method in methods:
+            seconds = measure_time(lambda: method(module_instance), repeat)
+            peak = measure_peak_memory(lambda: method(module_instance))
+
+            print(
+                f"{module_instance.name:<30}{method_name:<10}"
+                f"{seconds:>12.4f}{peak / 1024:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import time
+import random
+import click
+
+from typing import Dict, List, Tuple
+from c4dstubs.signatures import Argument, Class, Function, Hint, Module
+from c4dstubs.resolver import resolve_modules
+
+
+def build_package(
+    class_count: int,
+    classes_per_module: int = 50,
+    methods_per_class: int = 10,
+    seed: int = 0,
+) -> Tuple[List[Module], Dict[str, str]]:
+    # modules nested two levels below c4d with classes that reference
+    # random classes of the whole package by their qualified name
+    generator = random.Random(seed)
+
+    module_count = max(class_count // classes_per_module, 1)
+    module_names = [
+        f"c4d.modules{x % 10}.module{x}" for x in range(module_count)
+    ]
+
+    class_names = [f"Class{x}" for x in range(class_count)]
+    qualified_names = [
+        f"{module_names[x % module_count]}.{class_names[x]}"
+        for x in range(class_count)
+    ]
+
+    modules = [Module(x, is_init_file=True) for x in module_names]
+    classes_lookup: Dict[str, str] = {}
+
+    for index, class_name in enumerate(class_names):
+        module_instance = modules[index % module_count]
+
+        functions: List[Function] = []
+
+        for method_index in range(methods_per_class):
+            arguments = [Argument("self")]
+
+            for argument_index in range(3):
+                hint = Hint(
+                    "Optional",
+                    [Hint(generator.choice(qualified_names))],
+                )
+
+                arguments.append(Argument(f"a{argument_index}", hint))
+
+            return_hint = Hint(
+                "List", [Hint(generator.choice(qualified_names))]
+            )
+
+            functions.append(
+                Function(f"Method{method_index}", arguments, return_hint)
+            )
+
+        bases = [generator.choice(qualified_names)]
+
+        module_instance.classes.append(
+            Class(class_name, bases, functions=functions)
+        )
+
+        classes_lookup[class_name] = module_instance.name
+
+    return (modules, classes_lookup)
+
+
+@click.command(
+    help="Measure hint and import resolution on synthetic packages of growing size."
+)
+@click.option(
+    "--classes",
+    "class_counts",
+    default=[1000, 2000, 4000, 8000],
+    multiple=True,
+    help="Number of classes of a synthetic package, may be repeated",
+)
+def main(class_counts: List[int]) -> None:
+    print(f"{'classes':>10}{'hints':>12}{'time [s]':>12}{'us/hint':>10}")
+
+    for class_count in class_counts:
+        modules, classes_lookup = build_package(class_count)
+
+        hint_count = sum(len(list(x.get_hints())) for x in modules)
+
+        start = time.perf_counter()
+
+        resolve_modules(modules, classes_lookup)
+
+        seconds = time.perf_counter() - start
+
+        print(
+            f"{class_count:>10}{hint_count:>12}{seconds:>12.3f}"
+            f"{seconds / hint_count * 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import sys
+import json
+import platform
+import tempfile
+import click
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from benchmarks.common import run_conversion
+from benchmarks.memory import measure_conversion_memory
+from benchmarks.package import PackageGenerator
+
+
+def run_phases(
+    src_directory: Path,
+    classes_file: Optional[Path] = None,
+    functions_file: Optional[Path] = None,
+    streaming: bool = False,
+    jobs: int = 1,
+    writers: int = 1,
+) -> Dict[str, float]:
+    # converts the package with convert_source and returns the time spent
+    # in each of its phases in seconds as reported by its profiler
+    with tempfile.TemporaryDirectory() as directory:
+        profile_file = Path(directory).joinpath("profile.json")
+
+        run_conversion(
+            src_directory,
+            classes_file,
+            functions_file,
+            streaming,
+            jobs,
+            writers,
+            profile_file,
+        )
+
+        with open(profile_file, "r") as f:
+            return json.load(f)["phases"]
+
+
+def measure_phases(
+    src_directory: Path,
+    repeat: int = 3,
+    classes_file: Optional[Path] = None,
+    functions_file: Optional[Path] = None,
+    streaming: bool = False,
+    jobs: int = 1,
+    writers: int = 1,
+) -> Dict[str, float]:
+    # best time of each phase over repeated runs in the order of the
+    # phases, every run writes into an empty directory so that no file is
+    # skipped as unchanged
+    result: Dict[str, float] = {}
+
+    for _ in range(repeat):
+        phases = run_phases(
+            src_directory,
+            classes_file,
+            functions_file,
+            streaming,
+            jobs,
+            writers,
+        )
+
+        for name, seconds in phases.items():
+            result[name] = min(result.get(name, float("inf")), seconds)
+
+    return result
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float,
+    minimum: float = 0.0,
+) -> List[str]:
+    # names of the phases that are slower than the baseline by more than
+    # the relative tolerance and more than the minimum in seconds, short
+    # phases are too noisy to be compared relatively
+    result: List[str] = []
+
+    for name, baseline_seconds in baseline["phases"].items():
+        seconds = current["phases"].get(name)
+
+        if seconds is None:
+            continue
+
+        if (
+            seconds > baseline_seconds * (1 + tolerance)
+            and seconds - baseline_seconds > minimum
+        ):
+            result.append(name)
+
+    return result
+
+
+@click.group(help="Benchmark the phases of convert_source.")
+def main() -> None:
+    pass
+
+
+def package_options(function: Callable[..., Any]) -> Callable[..., Any]:
+    options = [
+        click.option("--modules", default=10, help="Number of modules"),
+        click.option("--classes", default=20, help="Classes per module"),
+        click.option("--methods", default=10, help="Methods per class"),
+        click.option(
+            "--hint-lines",
+            default=3,
+            help="Typed arguments in the docstring of every method",
+        ),
+        click.option("--depth", default=2, help="Nesting depth of hints"),
+        click.option(
+            "--constants", default=5000, help="Constants in symbols.py"
+        ),
+        click.option("--seed", default=0, help="Seed of the generator"),
+    ]
+
+    for option in reversed(options):
+        function = option(function)
+
+    return function
+
+
+@main.command(help="Write a synthetic dummy package to DESTINATION.")
+@click.argument("destination")
+@package_options
+def generate(destination: str, **options: int) -> None:
+    PackageGenerator(**options).write(Path(destination))
+
+
+@main.command(
+    help="Time every phase on a synthetic package or the SOURCE dummy package."
+)
+@click.option("--source", default=None, help="Existing dummy package")
+@click.option("--classes-file", default=None, help="Classes overrides")
+@click.option("--functions-file", default=None, help="Functions overrides")
+@click.option("--repeat", default=3, help="Number of timed runs")
+@click.option("--output", default=None, help="JSON file for the results")
+@click.option(
+    "--memory",
+    is_flag=True,
+    default=False,
+    help="Measure the peak memory of batch and streaming conversions",
+)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    default=False,
+    help="Convert one module after another",
+)
+@click.option(
+    "--jobs", default=1, help="Number of processes used to parse files"
+)
+@click.option("--writers", default=1, help="Number of threads writing modules")
+@package_options
+def run(
+    source: Optional[str],
+    classes_file: Optional[str],
+    functions_file: Optional[str],
+    repeat: int,
+    output: Optional[str],
+    memory: bool,
+    streaming: bool,
+    jobs: int,
+    writers: int,
+    **options: int,
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        if source:
+            src_directory = Path(source)
+            package: Dict[str, Any] = {"source": source}
+        else:
+            src_directory = Path(directory)
+            package = options
+
+            PackageGenerator(**options).write(src_directory)
+
+        phases = measure_phases(
+            src_directory,
+            repeat,
+            Path(classes_file) if classes_file else None,
+            Path(functions_file) if functions_file else None,
+            streaming,
+            jobs,
+            writers,
+        )
+
+        peaks: Dict[str, int] = {}
+
+        if memory:
+            peaks = measure_conversion_memory(
+                src_directory,
+                Path(classes_file) if classes_file else None,
+                Path(functions_file) if functions_file else None,
+            )
+
+    result: Dict[str, Any] = {
+        "package": package,
+        "conversion": {
+            "streaming": streaming,
+            "jobs": jobs,
+            "writers": writers,
+        },
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "phases": phases,
+        "total": sum(phases.values()),
+    }
+
+    for name, seconds in phases.items():
+        print(f"{name:>10}{seconds * 1000:>12.2f} ms")
+
+    print(f"{'total':>10}{result['total'] * 1000:>12.2f} ms")
+
+    if peaks:
+        # peak memory of a whole conversion per mode in bytes
+        result["memory"] = peaks
+
+        for mode, peak in peaks.items():
+            print(f"{mode:>10}{peak / 2 ** 20:>12.2f} MiB")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+@main.command(help="Compare the CURRENT results with the BASELINE results.")
+@click.argument("baseline")
+@click.argument("current")
+@click.option(
+    "--tolerance",
+    default=0.1,
+    help="Relative slowdown of a phase that is reported as a regression",
+)
+@click.option(
+    "--minimum",
+    default=5.0,
+    help="Slowdown in milliseconds below which a phase is not reported",
+)
+def compare(
+    baseline: str, current: str, tolerance: float, minimum: float
+) -> None:
+    with open(baseline) as f:
+        baseline_result = json.load(f)
+
+    with open(current) as f:
+        current_result = json.load(f)
+
+    if baseline_result["package"] != current_result["package"]:
+        print("Warning: results were measured on different packages")
+
+    if baseline_result.get("conversion") != current_result.get("conversion"):
+        print("Warning: results were measured with different options")
+
+    # phases are renamed or split as the converter changes
+    missing_phases = (
+        baseline_result["phases"].keys() ^ current_result["phases"].keys()
+    )
+
+    if missing_phases:
+        print(
+            "Warning: phases not measured in both results:"
+            f" {', '.join(sorted(missing_phases))}"
+        )
+
+    regressions = compare_results(
+        baseline_result, current_result, tolerance, minimum / 1000
+    )
+
+    print(f"{'phase':>10}{'baseline':>12}{'current':>12}{'change':>10}")
+
+    for name, baseline_seconds in baseline_result["phases"].items():
+        seconds = current_result["phases"].get(name)
+
+        if seconds is None:
+            continue
+
+        change = seconds / baseline_seconds - 1 if baseline_seconds else 0
+        marker = " !" if name in regressions else ""
+
+        print(
+            f"{name:>10}{baseline_seconds * 1000:>10.2f}ms"
+            f"{seconds * 1000:>10.2f}ms{change:>+10.1%}{marker}"
+        )
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
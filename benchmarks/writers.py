@@ -0,0 +1,75 @@
+import time
+import tempfile
+import click
+
+from pathlib import Path
+from typing import List, Tuple
+from c4dstubs.files import StagedDirectory
+from c4dstubs.api import Module, write_stub
+from c4dstubs.resolver import resolve_modules
+from benchmarks.common import load_modules, measure_time
+
+
+class SlowStagedDirectory(StagedDirectory):
+    # adds a fixed latency to every stored file like a network mount
+    def __init__(self, directory: Path, writers: int, latency: float) -> None:
+        super().__init__(directory, writers)
+
+        self.latency = latency
+
+    def store(self, file: Path, data: bytes) -> bool:
+        time.sleep(self.latency)
+
+        return super().store(file, data)
+
+
+def write_modules(
+    modules: List[Tuple[Path, Module]], writers: int, latency: float
+) -> None:
+    # every run writes into an empty directory so no file is unchanged
+    with tempfile.TemporaryDirectory() as directory:
+        with SlowStagedDirectory(
+            Path(directory), writers, latency
+        ) as staged_directory:
+            for _, module_instance in modules:
+                staged_directory.write(
+                    module_instance.file_path,
+                    lambda f: write_stub(f, module_instance),
+                )
+
+
+@click.command(
+    help="Measure the save phase of the SOURCE dummy package with different numbers of writer threads."
+)
+@click.argument("source")
+@click.argument("classes")
+@click.argument("functions")
+@click.option(
+    "--latency", default=0.01, help="Seconds added to every stored file"
+)
+@click.option("--repeat", default=3, help="Number of timed runs")
+def main(
+    source: str, classes: str, functions: str, latency: float, repeat: int
+) -> None:
+    modules = load_modules(Path(source), Path(classes), Path(functions))
+
+    classes_lookup = {"UUID": "uuid"}
+
+    for _, module_instance in modules:
+        for class_instance in module_instance.classes:
+            classes_lookup[class_instance.name] = module_instance.name
+
+    resolve_modules([x for _, x in modules], classes_lookup)
+
+    print(f"{'writers':>8}{'time [s]':>12}")
+
+    for writers in (1, 2, 4, 8):
+        seconds = measure_time(
+            lambda: write_modules(modules, writers, latency), repeat
+        )
+
+        print(f"{writers:>8}{seconds:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import io
+import os
+import copy
+
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, TextIO, Tuple, Union
+from c4dstubs.signatures import (
+    Class,
+    Constant,
+    Function,
+    Hint,
+    Module,
+    Writer,
+    STUB_HEADER,
+)
+from c4dstubs.parsers import parse_file, parse_source
+from c4dstubs.parallel import ParseResult
+from c4dstubs.overrides import OverrideRegistry
+from c4dstubs.resolver import resolve_modules
+from c4dstubs.sharding import shard_modules
+from c4dstubs.worklist import Worklist
+from c4dstubs.memo import HintMemo
+
+# text of a module or the file it is read from
+Source = Union[str, Path]
+
+
+def module_name_from_file_path(file: Path, src_directory: Path) -> str:
+    file_relative_path = file.relative_to(src_directory)
+
+    path, _ = os.path.splitext(file_relative_path)
+
+    dirname, basename = os.path.split(path)
+
+    if basename == "__init__":
+        return dirname.replace("/", ".")
+    else:
+        return path.replace("/", ".")
+
+
+def write_stub(
+    f: TextIO, module_instance: Module, docstrings: str = "full"
+) -> None:
+    f.write(STUB_HEADER)
+
+    module_instance.write(Writer(f, docstrings=docstrings))
+
+
+def render_stub(module_instance: Module, docstrings: str = "full") -> str:
+    stream = io.StringIO()
+
+    write_stub(stream, module_instance, docstrings)
+
+    return stream.getvalue()
+
+
+def find_sources(src_directory: Path) -> List[Path]:
+    # files of the c4d package below the source directory
+    result: List[Path] = []
+
+    for root, _, filenames in os.walk(src_directory.joinpath("c4d")):
+        root_path = Path(root)
+
+        for filename in filenames:
+            result.append(root_path.joinpath(filename))
+
+    return result
+
+
+def directory_sources(src_directory: Path) -> Dict[str, Source]:
+    # sources of a dummy package keyed by their relative path
+    return {
+        x.relative_to(src_directory).as_posix(): x
+        for x in find_sources(src_directory)
+    }
+
+
+def build_modules(
+    files: List[Path], src_directory: Path, parse_results: List[ParseResult]
+) -> Tuple[List[Module], Dict[str, str]]:
+    # modules of the parsed files and the names of the modules
+    # defining each class
+    modules: List[Module] = []
+
+    classes_lookup: Dict[str, str] = {"UUID": "uuid"}
+
+    for file, (constant_instances, class_instances, function_instances) in zip(
+        files, parse_results
+    ):
+        module_name = module_name_from_file_path(file, src_directory)
+
+        module_instance = Module(
+            module_name,
+            constants=constant_instances,
+            classes=class_instances,
+            functions=function_instances,
+            is_init_file="__init__" in str(file),
+        )
+
+        for class_instance in class_instances:
+            classes_lookup[class_instance.name] = module_instance.name
+
+        modules.append(module_instance)
+
+    return (modules, classes_lookup)
+
+
+class StubSet:
+    __slots__ = ("modules", "stubs", "overrides", "worklist")
+
+    def __init__(
+        self,
+        modules: List[Module],
+        stubs: Dict[str, str],
+        overrides: OverrideRegistry,
+        worklist: Worklist,
+    ) -> None:
+        # resolved modules in the order of the sources
+        self.modules = modules
+
+        # content of the stub files by their relative path, shards
+        # included
+        self.stubs = stubs
+
+        # overrides used for the conversion including the ones
+        # added from user input
+        self.overrides = overrides
+
+        # hints that could not be parsed with their occurrences and the
+        # answers given for them
+        self.worklist = worklist
+
+
+def generate_stubs(
+    sources: Mapping[str, Source],
+    classes: Optional[List[Class]] = None,
+    functions: Optional[List[Function]] = None,
+    answers: Optional[Dict[str, str]] = None,
+    silent: bool = True,
+    shard_size: Optional[int] = None,
+    docstrings: str = "full",
+) -> StubSet:
+    # converts sources keyed by their path relative to the source
+    # directory like c4d/__init__.py without writing any file, answers
+    # replace raw hints that can not be parsed
+    if classes is None:
+        classes = []
+
+    if functions is None:
+        functions = []
+
+    # every call parses with its own memo, so neither earlier calls nor
+    # conversions of the process change the result
+    memo = HintMemo()
+
+    if answers:
+        memo.answers.update(answers)
+
+    worklist = Worklist(memo)
+
+    # interned hints of earlier calls are dropped to save memory, they still
+    # equal the hints of this call
+    Hint.clear_instances()
+
+    # resolution changes the hints of the overrides it shares with the
+    # modules, so the objects of the caller are left untouched
+    overrides = OverrideRegistry(*copy.deepcopy((classes, functions)))
+
+    files: List[Path] = []
+    parse_results: List[ParseResult] = []
+
+    for name, source in sources.items():
+        constants: List[Constant] = []
+        class_instances: List[Class] = []
+        function_instances: List[Function] = []
+
+        if isinstance(source, Path):
+            parse_file(
+                source,
+                constants,
+                class_instances,
+                function_instances,
+                overrides,
+                silent,
+                memo,
+            )
+        else:
+            parse_source(
+                source,
+                constants,
+                class_instances,
+                function_instances,
+                overrides,
+                silent,
+                memo,
+            )
+
+        files.append(Path(name))
+        parse_results.append((constants, class_instances, function_instances))
+
+    modules, classes_lookup = build_modules(files, Path("."), parse_results)
+
+    worklist.update(modules)
+
+    resolve_modules(modules, classes_lookup)
+
+    output_modules = modules
+
+    if shard_size:
+        output_modules = shard_modules(modules, shard_size, docstrings)
+
+    stubs = {
+        x.file_path.as_posix(): render_stub(x, docstrings)
+        for x in output_modules
+    }
+
+    return StubSet(modules, stubs, overrides, worklist)
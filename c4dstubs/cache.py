@@ -0,0 +1,132 @@
+import os
+import json
+import hashlib
+
+from pathlib import Path
+from typing import Dict, List, Optional
+from c4dstubs.profiling import count
+
+MANIFEST_NAME = "manifest.json"
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(file: Path) -> str:
+    if not file.is_file():
+        return hash_bytes(b"")
+
+    with open(file, "rb") as f:
+        return hash_bytes(f.read())
+
+
+def tool_fingerprint() -> str:
+    # the sources of this package take the place of a version number
+    # so that any change to the generator invalidates cached results
+    package_directory = Path(__file__).parent
+
+    result = hashlib.sha256()
+
+    for file in sorted(package_directory.glob("*.py")):
+        result.update(file.name.encode())
+        result.update(hash_file(file).encode())
+
+    return result.hexdigest()
+
+
+class BuildCache:
+    def __init__(
+        self,
+        directory: Path,
+        override_files: Optional[List[Path]] = None,
+        fail_silently: bool = True,
+    ) -> None:
+        if override_files is None:
+            override_files = []
+
+        self.directory = directory
+        self.tool = tool_fingerprint()
+        self.overrides = hash_bytes(
+            "".join(hash_file(x) for x in override_files).encode()
+        )
+        self.fail_silently = fail_silently
+        self.files: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def manifest_file(self) -> Path:
+        return self.directory.joinpath(MANIFEST_NAME)
+
+    def entry_file(self, key: str) -> Path:
+        return self.directory.joinpath(f"{key}.pickle")
+
+    def key(self, file: Path) -> str:
+        with open(file, "rb") as f:
+            content = f.read()
+
+        return hash_bytes(
+            f"{self.tool}:{self.overrides}:{self.fail_silently}:".encode()
+            + content
+        )
+
+    def load(self, file: Path) -> Optional[bytes]:
+        key = self.key(file)
+
+        self.files[str(file)] = key
+
+        try:
+            with open(self.entry_file(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+
+            count("cache_misses")
+
+            return None
+
+        self.hits += 1
+
+        count("cache_hits")
+
+        return data
+
+    def store(self, file: Path, data: bytes) -> None:
+        key = self.files.get(str(file)) or self.key(file)
+
+        self.files[str(file)] = key
+
+        if not self.directory.is_dir():
+            os.makedirs(self.directory, mode=0o777, exist_ok=True)
+
+        temporary_file = self.entry_file(f"{key}.{os.getpid()}.tmp")
+
+        with open(temporary_file, "wb") as f:
+            f.write(data)
+
+        os.replace(temporary_file, self.entry_file(key))
+
+    def save(self) -> None:
+        if not self.directory.is_dir():
+            os.makedirs(self.directory, mode=0o777, exist_ok=True)
+
+        manifest = {
+            "tool": self.tool,
+            "overrides": self.overrides,
+            "files": self.files,
+        }
+
+        temporary_file = self.directory.joinpath(f"{MANIFEST_NAME}.tmp")
+
+        with open(temporary_file, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        os.replace(temporary_file, self.manifest_file)
+
+        # remove entries that are no longer referenced by the manifest
+        keys = set(self.files.values())
+
+        for entry_file in self.directory.glob("*.pickle"):
+            if entry_file.stem not in keys:
+                os.remove(entry_file)
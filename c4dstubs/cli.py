@@ -1,7 +1,13 @@
+import sys
 import click
 
 from pathlib import Path
-from c4dstubs.generator import convert_source
+from typing import Optional
+from c4dstubs.docstrings import DOCSTRING_POLICIES
+from c4dstubs.manifest import BuildManifest
+
+# the converter is imported once the stubs need to be generated, so checks
+# of up to date stubs do not pay for it
 
 
 @click.command(
@@ -16,12 +22,100 @@ from c4dstubs.generator import convert_source
     default=True,
     help="Use this flag to enable asking for user input in cases where the type can not be derived",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of processes used to parse source files, only applies to silent mode",
+)
+@click.option(
+    "--cache",
+    default=None,
+    help="Directory used to cache parsed source files between runs, only applies to silent mode",
+)
+@click.option(
+    "--shard-size",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Split modules larger than this number of bytes into private shard modules",
+)
+@click.option(
+    "--docstrings",
+    default="full",
+    type=click.Choice(DOCSTRING_POLICIES),
+    help="Write full docstrings, only their first paragraph or none at all",
+)
+@click.option(
+    "--profile",
+    default=None,
+    help="JSON file for the time spent per phase and file and counted events",
+)
+@click.option(
+    "--profile-stats",
+    default=None,
+    help="File for cProfile statistics of the whole run, readable by pstats",
+)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    default=False,
+    help="Convert one module after another to bound memory by the largest module, parses in a single process",
+)
+@click.option(
+    "--writers",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of threads writing rendered modules while the next ones are rendered",
+)
+@click.option(
+    "--worklist",
+    default=None,
+    help="YAML file collecting the hints that can not be parsed instead of asking for them while parsing, they are asked for in one session after parsing in interactive mode and answers in the file are applied by later runs",
+)
+@click.option(
+    "--check",
+    is_flag=True,
+    default=False,
+    help="Only check whether the stubs of the last build are up to date with the sources, overrides, options and converter, exits with 1 if they are not",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Convert even if the stubs of the last build are up to date",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="Keep running and regenerate the stubs affected by changes of the source or override files, only applies to silent mode",
+)
+@click.option(
+    "--interval",
+    default=0.5,
+    type=click.FloatRange(min=0.0),
+    help="Seconds between checks for changes in watch mode",
+)
 def main(
     source: str,
     destination: str,
     classes: str,
     functions: str,
     silent: bool = True,
+    jobs: int = 1,
+    cache: Optional[str] = None,
+    shard_size: Optional[int] = None,
+    docstrings: str = "full",
+    profile: Optional[str] = None,
+    profile_stats: Optional[str] = None,
+    streaming: bool = False,
+    writers: int = 1,
+    worklist: Optional[str] = None,
+    check: bool = False,
+    force: bool = False,
+    watch: bool = False,
+    interval: float = 0.5,
 ) -> None:
 
     source_directory = Path(source)
@@ -50,13 +144,91 @@ def main(
             f"Path must be a valid directory not '{functions_file.parent}'"
         )
 
-    convert_source(
-        source_directory,
-        destination_directory,
-        classes_file,
-        functions_file,
-        silent,
-    )
+    if check and watch:
+        raise ValueError("Watch mode can not be combined with a check")
+
+    if check or not (watch or force or profile or profile_stats):
+        manifest = BuildManifest(
+            source_directory,
+            destination_directory,
+            classes_file,
+            functions_file,
+            silent,
+            shard_size,
+            docstrings,
+            Path(worklist) if worklist else None,
+        )
+
+        reason = manifest.check()
+
+        if reason is None:
+            print("Stubs are up to date")
+
+            return
+
+        if check:
+            print(f"Stubs are out of date: {reason}")
+
+            sys.exit(1)
+
+    if watch:
+        from c4dstubs.watch import Watcher
+
+        if not silent:
+            raise ValueError("Watch mode can not ask for user input")
+
+        if worklist:
+            raise ValueError("Watch mode does not support a worklist")
+
+        watcher = Watcher(
+            source_directory,
+            destination_directory,
+            classes_file,
+            functions_file,
+            Path(cache) if cache else None,
+            shard_size,
+            docstrings,
+        )
+
+        try:
+            watcher.run(interval)
+        except KeyboardInterrupt:
+            pass
+
+        return
+
+    import cProfile
+
+    from c4dstubs.generator import convert_source
+
+    profiler: Optional[cProfile.Profile] = None
+
+    if profile_stats:
+        profiler = cProfile.Profile()
+
+        profiler.enable()
+
+    try:
+        convert_source(
+            source_directory,
+            destination_directory,
+            classes_file,
+            functions_file,
+            silent,
+            jobs,
+            Path(cache) if cache else None,
+            shard_size,
+            docstrings,
+            Path(profile) if profile else None,
+            streaming,
+            writers,
+            Path(worklist) if worklist else None,
+        )
+    finally:
+        if profiler:
+            profiler.disable()
+
+            profiler.dump_stats(profile_stats)
 
 
 if __name__ == "__main__":
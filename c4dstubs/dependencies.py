@@ -0,0 +1,100 @@
+import sys
+
+from typing import Dict, Iterable, Optional, Set
+from c4dstubs.signatures import Module
+from c4dstubs.resolver import SymbolTable
+
+
+def module_references(module_instance: Module) -> Set[str]:
+    # names a module may resolve to classes, hints and bases are looked up
+    # by their last part whether they are qualified or already resolved,
+    # names are interned since the graph outlives the modules
+    result: Set[str] = set()
+
+    for hint_instance in module_instance.get_hints():
+        if hint_instance.name:
+            result.add(sys.intern(hint_instance.name.split(".")[-1]))
+
+    for class_instance in module_instance.classes:
+        for base in class_instance.bases:
+            result.add(sys.intern(base.split(".")[-1]))
+
+    return result
+
+
+class DependencyGraph:
+    def __init__(
+        self, classes_lookup: Optional[Dict[str, str]] = None
+    ) -> None:
+        if classes_lookup is None:
+            classes_lookup = {}
+
+        # class name to name of the module defining the class
+        self.classes: Dict[str, str] = dict(classes_lookup)
+
+        # module name to the names it references
+        self.references: Dict[str, Set[str]] = {}
+
+        # referenced name to the names of the modules referencing it
+        self.dependents: Dict[str, Set[str]] = {}
+
+    def add_module(self, module_instance: Module) -> None:
+        self.remove_module(module_instance.name)
+
+        references = module_references(module_instance)
+
+        self.references[module_instance.name] = references
+
+        for name in references:
+            self.dependents.setdefault(name, set()).add(module_instance.name)
+
+    def remove_module(self, module_name: str) -> None:
+        for name in self.references.pop(module_name, set()):
+            dependents = self.dependents[name]
+
+            dependents.discard(module_name)
+
+            if not dependents:
+                del self.dependents[name]
+
+    def affected_modules(
+        self,
+        changed_modules: Iterable[str] = (),
+        changed_classes: Iterable[str] = (),
+    ) -> Set[str]:
+        # modules whose stubs can change if the given modules changed or
+        # the given classes were added, removed or moved to another module
+        result = set(changed_modules)
+
+        for class_name in changed_classes:
+            result.update(self.dependents.get(class_name, set()))
+
+        return result
+
+    def update_classes(self, classes_lookup: Dict[str, str]) -> Set[str]:
+        # replaces the classes and returns the modules affected by classes
+        # that were added, removed or moved and the modules whose imported
+        # submodules changed
+        changed_classes = {
+            x
+            for x in self.classes.keys() | classes_lookup.keys()
+            if self.classes.get(x) != classes_lookup.get(x)
+        }
+
+        result = self.affected_modules((), changed_classes)
+
+        # submodules are imported in the order of the classes
+        # so the order is compared as well
+        if list(self.classes.items()) != list(classes_lookup.items()):
+            previous_symbol_table = SymbolTable(self.classes)
+            symbol_table = SymbolTable(classes_lookup)
+
+            for module_name in self.references:
+                if previous_symbol_table.submodules(
+                    module_name
+                ) != symbol_table.submodules(module_name):
+                    result.add(module_name)
+
+        self.classes = dict(classes_lookup)
+
+        return result
@@ -0,0 +1,72 @@
+import re
+
+from typing import List
+
+# docstrings are written completely, up to the first blank line or not at all
+DOCSTRING_POLICIES = ("full", "summary", "none")
+
+# lines whose first field starts with type, rtype or param
+FIELD_PATTERN = re.compile(
+    r"^[^\S\n:]*(?::[^\S\n:]*)*(?P<kind>type|rtype|param)[^\n]*",
+    re.MULTILINE,
+)
+
+
+class DocstringField:
+    __slots__ = ("name", "kind", "text", "line", "source")
+
+    def __init__(
+        self, name: str, kind: str, text: str, line: int, source: str
+    ) -> None:
+        # argument name, empty for return types
+        self.name = name
+
+        # type, rtype or param
+        self.kind = kind
+        self.text = text
+
+        # index and content of the line the field was found in
+        self.line = line
+        self.source = source
+
+
+def normalize_docstring(docstring: str) -> str:
+    # strips every line and uses forward slashes
+    return (
+        "\n".join(
+            [x.strip() for x in docstring.replace("\\", "/").split("\n")]
+        )
+        + "\n"
+    )
+
+
+def extract_fields(docstring: str) -> List[DocstringField]:
+    # fields of a normalized docstring in the order they appear
+    result: List[DocstringField] = []
+
+    line = 0
+    position = 0
+
+    for match in FIELD_PATTERN.finditer(docstring):
+        # a field and a text separated and surrounded by colons only
+        parts = [x for x in match[0].split(":") if x and not x.isspace()]
+
+        if len(parts) != 2:
+            continue
+
+        start = match.start()
+
+        line += docstring.count("\n", position, start)
+        position = start
+
+        kind = match["kind"]
+        name = ""
+
+        if kind != "rtype":
+            name = parts[0].strip().replace(f"{kind} ", "")
+
+        result.append(
+            DocstringField(name, kind, parts[1].strip(), line, match[0])
+        )
+
+    return result
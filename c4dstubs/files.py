@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from types import TracebackType
+from typing import Callable, Deque, Dict, List, Optional, TextIO, Tuple, Type
+from c4dstubs.cache import hash_bytes, hash_file
+from c4dstubs.profiling import Profiler, profile_phase
+
+
+def write_file_atomic(file: Path, content: str) -> None:
+    # write next to the file and rename, so readers never see
+    # a partially written file
+    temporary_file = file.with_name(f".{file.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(temporary_file, "w") as f:
+            f.write(content)
+
+        os.replace(temporary_file, file)
+    except BaseException:
+        if temporary_file.exists():
+            os.remove(temporary_file)
+
+        raise
+
+
+def write_if_changed(file: Path, content: str) -> bool:
+    # returns whether the file has been written
+    if file.is_file():
+        with open(file, "r") as f:
+            if f.read() == content:
+                return False
+
+    write_file_atomic(file, content)
+
+    return True
+
+
+class StagedDirectory:
+    # files are written to a staging directory within the destination
+    # and only files whose content changed are renamed into place
+    # once all of them have been written, the staging directory is only
+    # created for the first changed file, so an unchanged destination is
+    # left untouched, rendering and writing are timed apart by the profiler
+    def __init__(
+        self,
+        directory: Path,
+        writers: int = 1,
+        profiler: Optional[Profiler] = None,
+    ) -> None:
+        if writers < 1:
+            raise ValueError(f"Writers must be at least 1 not '{writers}'")
+
+        self.directory = directory
+        self.entered = False
+        self.staging_directory: Optional[Path] = None
+        self.staging_lock = threading.Lock()
+        self.changed_files: List[Path] = []
+        self.removed_files: List[Path] = []
+        self.file_sizes: Dict[Path, int] = {}
+        self.file_count = 0
+        self.profiler = profiler
+
+        # rendered files are stored by a pool of threads, at most two per
+        # thread are pending, so rendering waits for slow disks instead of
+        # buffering the whole package
+        self.writers = writers
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.pending: Deque[Tuple[Path, Future]] = deque()
+
+    def __enter__(self) -> StagedDirectory:
+        if not self.directory.is_dir():
+            os.makedirs(self.directory, mode=0o777, exist_ok=True)
+
+        self.entered = True
+
+        if self.writers > 1:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.writers, thread_name_prefix="writer"
+            )
+
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        try:
+            if exception is None:
+                with profile_phase(self.profiler, "write"):
+                    self.flush()
+                    self.publish()
+        finally:
+            # pending files are not needed anymore if anything failed
+            for _, future in self.pending:
+                future.cancel()
+
+            self.pending.clear()
+
+            if self.executor:
+                self.executor.shutdown(wait=True)
+
+                self.executor = None
+
+            if self.staging_directory:
+                shutil.rmtree(self.staging_directory, ignore_errors=True)
+
+                self.staging_directory = None
+
+            self.entered = False
+
+    def staging(self) -> Path:
+        # creates the staging directory once, writer threads may ask for it
+        # at the same time
+        with self.staging_lock:
+            if not self.staging_directory:
+                self.staging_directory = Path(
+                    tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+                )
+
+            return self.staging_directory
+
+    def store(self, file: Path, data: bytes) -> bool:
+        # stages the content of a file and returns whether it differs
+        # from the published file, may run in a writer thread
+        if not self.entered:
+            raise Exception("Staged directory must be entered before writing")
+
+        destination_file = self.directory.joinpath(file)
+
+        if destination_file.is_file():
+            if destination_file.stat().st_size == len(data):
+                if hash_file(destination_file) == hash_bytes(data):
+                    return False
+
+        staged_file = self.staging().joinpath(file)
+
+        if not staged_file.parent.is_dir():
+            os.makedirs(staged_file.parent, mode=0o777, exist_ok=True)
+
+        with open(staged_file, "wb") as f:
+            f.write(data)
+
+        return True
+
+    def collect(self, limit: int = 0) -> None:
+        # waits for pending files in the order they were written until no
+        # more than the limit are left, errors of writers are raised here
+        while len(self.pending) > limit or (
+            self.pending and self.pending[0][1].done()
+        ):
+            file, future = self.pending.popleft()
+
+            if future.result():
+                self.changed_files.append(file)
+
+    def flush(self) -> None:
+        self.collect()
+
+    def write(self, file: Path, write: Callable[[TextIO], None]) -> None:
+        # renders the content of a file relative to the directory, which
+        # is compared with the published file and staged once it changed
+        if not self.entered:
+            raise Exception("Staged directory must be entered before writing")
+
+        with profile_phase(self.profiler, "render"):
+            start = time.perf_counter()
+
+            stream = io.StringIO()
+
+            write(stream)
+
+            data = stream.getvalue().encode("utf-8")
+
+            if self.profiler:
+                self.profiler.add_file(
+                    "render", file, time.perf_counter() - start
+                )
+
+        self.file_count += 1
+        self.file_sizes[file] = len(data)
+
+        with profile_phase(self.profiler, "write"):
+            if not self.executor:
+                if self.store(file, data):
+                    self.changed_files.append(file)
+
+                return
+
+            # backpressure, wait for the oldest files before adding another
+            self.collect(self.writers * 2 - 1)
+
+            self.pending.append(
+                (file, self.executor.submit(self.store, file, data))
+            )
+
+    def remove(self, file: Path) -> None:
+        # removes a file relative to the directory once published
+        if self.directory.joinpath(file).is_file():
+            self.removed_files.append(file)
+
+    def discard(self, file: Path) -> None:
+        # withdraws a file written before, the published file is kept
+        if file not in self.file_sizes:
+            return
+
+        self.flush()
+
+        del self.file_sizes[file]
+
+        self.file_count -= 1
+
+        if file in self.changed_files and self.staging_directory:
+            self.changed_files.remove(file)
+
+            os.remove(self.staging_directory.joinpath(file))
+
+    def publish(self) -> None:
+        for file in self.removed_files:
+            if file not in self.file_sizes:
+                os.remove(self.directory.joinpath(file))
+
+                # remove directories left empty
+                for parent in file.parents:
+                    parent_directory = self.directory.joinpath(parent)
+
+                    if parent == Path(".") or any(parent_directory.iterdir()):
+                        break
+
+                    os.rmdir(parent_directory)
+
+        if not self.changed_files:
+            return
+
+        staging_directory = self.staging()
+
+        for file in self.changed_files:
+            destination_file = self.directory.joinpath(file)
+
+            if not destination_file.parent.is_dir():
+                os.makedirs(destination_file.parent, mode=0o777, exist_ok=True)
+
+            os.replace(staging_directory.joinpath(file), destination_file)
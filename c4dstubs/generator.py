@@ -1,12 +1,27 @@
-import os
-
 from math import ceil, floor
-from typing import Generator, List, Optional, Dict
+from typing import List, Optional, Dict, TextIO
 from pathlib import Path
 
-from c4dstubs.signatures import Class, Argument, Function, Hint
-from c4dstubs.parsers import parse_file
+from c4dstubs.signatures import Hint, Module
+from c4dstubs.api import (
+    build_modules,
+    find_sources,
+    module_name_from_file_path,
+    write_stub,
+)
+from c4dstubs.parallel import parse_files
+from c4dstubs.parsers import scan_class_names
+from c4dstubs.cache import BuildCache
+from c4dstubs.resolver import Resolver, SymbolTable, resolve_modules
+from c4dstubs.files import StagedDirectory
+from c4dstubs.dependencies import DependencyGraph
+from c4dstubs.profiling import Profiler
+from c4dstubs.worklist import Worklist
+from c4dstubs.memo import MEMO_NAME, hint_memo
+from c4dstubs.manifest import BuildManifest
+from c4dstubs.sharding import shard_modules, shard_files
 from c4dstubs.overrides import (
+    OverrideRegistry,
     load_functions,
     load_classes,
     store_functions,
@@ -14,309 +29,360 @@ from c4dstubs.overrides import (
 )
 
 
-class Import:
-    def __init__(self, name: str, module: str) -> None:
-        self.name = name
-        self.module = module
-
-
-class Module:
-    def __init__(
-        self,
-        name: str,
-        imports: Optional[List[Import]] = None,
-        constants: Optional[List[Argument]] = None,
-        classes: Optional[List[Class]] = None,
-        functions: Optional[List[Function]] = None,
-        is_init_file: bool = False,
-    ) -> None:
-        if imports is None:
-            imports = []
+def print_module_header(module_instance: Module) -> None:
+    name_length = len(module_instance.name)
+    line_length = 78
+    padding_left = int(floor(line_length * 0.5) - floor(name_length * 0.5))
+    padding_right = line_length - padding_left - name_length
+
+    print("╔" + "═" * line_length + "╗")
+    print(
+        "║"
+        + " " * padding_left
+        + module_instance.name
+        + " " * padding_right
+        + "║"
+    )
+    print("╚" + "═" * line_length + "╝")
+
+    print(f"Constants: {module_instance.constant_count}")
+    print(f"Classes: {len(module_instance.classes)}")
+    print(f"Functions: {len(module_instance.functions)}")
+
+
+def save_modules(
+    staged_directory: StagedDirectory,
+    output_modules: List[Module],
+    modules: List[Module],
+    docstrings: str = "full",
+) -> None:
+    # writes the output modules, which are the modules or their shards
+    for module_instance in output_modules:
+        print_module_header(module_instance)
 
-        if constants is None:
-            constants = []
+        def write_module(f: TextIO) -> None:
+            write_stub(f, module_instance, docstrings)
 
-        if classes is None:
-            classes = []
+        staged_directory.write(module_instance.file_path, write_module)
 
-        if functions is None:
-            functions = []
+        size = staged_directory.file_sizes[module_instance.file_path]
 
-        self.name = name
-        self.imports = imports
-        self.constants = constants
-        self.classes = classes
-        self.functions = functions
-        self.is_init_file = is_init_file
+        print(f"Size: {size} bytes")
 
-    @property
-    def module_name(self) -> str:
-        return self.name.split(".")[-1]
+    # remove shards of previous runs that are no longer written
+    for module_instance in modules:
+        for file in shard_files(module_instance, staged_directory.directory):
+            staged_directory.remove(file)
 
-    @property
-    def module_path(self) -> str:
-        return ".".join(self.name.split(".")[:-1])
 
-    @property
-    def file_path(self) -> Path:
-        result = self.name.replace(".", "/")
+def scan_classes(files: List[Path], src_directory: Path) -> Dict[str, str]:
+    # class names to module names without parsing the files
+    result: Dict[str, str] = {"UUID": "uuid"}
 
-        if self.is_init_file:
-            result += "/__init__"
+    for file in files:
+        module_name = module_name_from_file_path(file, src_directory)
 
-        result += ".pyi"
+        with open(file, "r") as f:
+            class_names = scan_class_names(f.read())
 
-        return Path(result)
+        for class_name in class_names:
+            result[class_name] = module_name
 
-    def get_hints(self) -> Generator[Hint, None, None]:
-        for constant_instance in self.constants:
-            yield from constant_instance.get_hints()
+    return result
 
-        for class_instance in self.classes:
-            yield from class_instance.get_hints()
 
-        for function_instance in self.functions:
-            yield from function_instance.get_hints()
+def convert_modules(
+    files: List[Path],
+    src_directory: Path,
+    destination_directory: Path,
+    overrides: OverrideRegistry,
+    profiler: Profiler,
+    silent: bool = True,
+    jobs: int = 1,
+    cache: Optional[BuildCache] = None,
+    shard_size: Optional[int] = None,
+    docstrings: str = "full",
+    writers: int = 1,
+    worklist: Optional[Worklist] = None,
+) -> StagedDirectory:
+    # parses all files before hints are resolved against their classes
+    with profiler.phase("parse"):
+        parse_results = parse_files(
+            files, overrides, silent, jobs, cache, profiler
+        )
 
-    def render(self) -> str:
-        result = ""
+        if cache:
+            cache.save()
 
-        # render imports
-        if self.imports:
-            grouped_imports: Dict[str, List[str]] = {}
+    if cache:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses")
 
-            for import_instance in self.imports:
-                if import_instance.module not in grouped_imports:
-                    grouped_imports[import_instance.module] = []
+    modules, classes_lookup = build_modules(
+        files, src_directory, parse_results
+    )
 
-                grouped_imports[import_instance.module].append(
-                    import_instance.name
-                )
+    if worklist:
+        worklist.update(modules)
 
-            for key, value in grouped_imports.items():
-                result += f"from {key} import " + ", ".join(value) + "\n"
+    resolve_modules(modules, classes_lookup, profiler)
 
-            result += "\n"
+    # split oversized modules into shards
+    output_modules = modules
 
-        # render constants
-        if self.constants:
-            result += "\n"
+    if shard_size:
+        with profiler.phase("shard"):
+            output_modules = shard_modules(modules, shard_size, docstrings)
 
-            for constant_instance in self.constants:
-                result += constant_instance.render() + "\n"
+    # save modules
+    with StagedDirectory(
+        destination_directory, writers, profiler
+    ) as staged_directory:
+        save_modules(staged_directory, output_modules, modules, docstrings)
 
-            result += "\n"
+    return staged_directory
 
-        # render classes
-        if self.classes:
-            result += "\n"
 
-            for class_instance in self.classes:
-                result += class_instance.render()
+def stream_modules(
+    files: List[Path],
+    src_directory: Path,
+    staged_directory: StagedDirectory,
+    overrides: OverrideRegistry,
+    profiler: Profiler,
+    silent: bool = True,
+    cache: Optional[BuildCache] = None,
+    shard_size: Optional[int] = None,
+    docstrings: str = "full",
+    worklist: Optional[Worklist] = None,
+) -> None:
+    # converts one module after another, so only a single parsed module
+    # is kept in memory, hints are resolved against the scanned classes
+    with profiler.phase("scan"):
+        classes_lookup = scan_classes(files, src_directory)
 
-                result += "\n"
+    dependencies = DependencyGraph(classes_lookup)
 
-        # render functions
-        if self.functions:
-            result += "\n"
+    # classes as they are parsed
+    parsed_classes: Dict[str, str] = {"UUID": "uuid"}
 
-            for function_instance in self.functions:
-                result += function_instance.render()
+    # files written per module to withdraw them if it is converted again
+    output_files: Dict[str, List[Path]] = {}
 
-                result += "\n"
+    def convert_file(file: Path, symbol_table: SymbolTable) -> None:
+        with profiler.phase("parse"):
+            ((constants, classes, functions),) = parse_files(
+                [file], overrides, silent, 1, cache, profiler
+            )
 
-        return result
+        module_instance = Module(
+            module_name_from_file_path(file, src_directory),
+            constants=constants,
+            classes=classes,
+            functions=functions,
+            is_init_file="__init__" in str(file),
+        )
 
+        for class_instance in classes:
+            parsed_classes[class_instance.name] = module_instance.name
 
-def module_name_from_file_path(file: Path, src_directory: Path) -> str:
-    file_relative_path = file.relative_to(src_directory)
+        if worklist:
+            worklist.record(module_instance)
+            worklist.apply(module_instance)
 
-    path, _ = os.path.splitext(file_relative_path)
+        dependencies.add_module(module_instance)
 
-    dirname, basename = os.path.split(path)
+        # resolved hints are not shared between modules, so they are
+        # released once the module has been written
+        resolver = Resolver(symbol_table)
 
-    if basename == "__init__":
-        return dirname.replace("/", ".")
-    else:
-        return path.replace("/", ".")
+        with profiler.phase("hints"):
+            class_names = resolver.resolve_hints(module_instance)
 
+        with profiler.phase("imports"):
+            resolver.resolve_imports(module_instance, class_names)
 
-def convert_source(
-    src_directory: Path,
-    destination_directory: Path,
-    classes_file: Path,
-    functions_file: Path,
-    silent: bool = True,
-) -> None:
-    package_directory = src_directory.joinpath("c4d")
+        output_modules = [module_instance]
 
-    # load overrides
-    class_overrides: List[Class] = load_classes(classes_file)
+        if shard_size:
+            with profiler.phase("shard"):
+                output_modules = shard_modules(
+                    output_modules, shard_size, docstrings
+                )
 
-    function_overrides: List[Function] = load_functions(functions_file)
+        for file_path in output_files.pop(module_instance.name, []):
+            staged_directory.discard(file_path)
 
-    # gather files
-    files: List[Path] = []
+        output_files[module_instance.name] = [
+            x.file_path for x in output_modules
+        ]
 
-    for root, _, filenames in os.walk(package_directory):
-        root_path = Path(root)
+        save_modules(
+            staged_directory, output_modules, [module_instance], docstrings
+        )
 
-        for filename in filenames:
-            file = root_path.joinpath(filename)
+    symbol_table = SymbolTable(classes_lookup)
 
-            files.append(file)
+    for file in files:
+        convert_file(file, symbol_table)
 
-    # load modules
-    modules: List[Module] = []
+    # the scan matches class statements in strings as well, modules
+    # affected by classes it got wrong are converted again
+    affected_modules = dependencies.update_classes(parsed_classes)
 
-    classes_lookup: Dict[str, str] = {"UUID": "uuid"}
+    if affected_modules:
+        print(f"Converting {len(affected_modules)} modules again")
 
-    for file in files:
-        module_name = module_name_from_file_path(file, src_directory)
+        symbol_table = SymbolTable(parsed_classes)
 
-        constant_instances: List[Argument] = []
+        for file in files:
+            if (
+                module_name_from_file_path(file, src_directory)
+                in affected_modules
+            ):
+                convert_file(file, symbol_table)
 
-        class_instances: List[Class] = []
+    if worklist and worklist.interactive:
+        # modules have been written already
+        if worklist.ask():
+            print("Answers are applied by the next run")
 
-        function_instances: List[Function] = []
 
-        parse_file(
-            file,
-            constant_instances,
-            class_instances,
-            function_instances,
-            class_overrides,
-            function_overrides,
+def convert_source(
+    src_directory: Path,
+    destination_directory: Path,
+    classes_file: Path,
+    functions_file: Path,
+    silent: bool = True,
+    jobs: int = 1,
+    cache_directory: Optional[Path] = None,
+    shard_size: Optional[int] = None,
+    docstrings: str = "full",
+    profile_file: Optional[Path] = None,
+    streaming: bool = False,
+    writers: int = 1,
+    worklist_file: Optional[Path] = None,
+) -> None:
+    # the manifest of the last build is kept until this one succeeded and
+    # only rewritten if it changed
+    manifest = BuildManifest(
+        src_directory,
+        destination_directory,
+        classes_file,
+        functions_file,
+        silent,
+        shard_size,
+        docstrings,
+        worklist_file,
+    )
+
+    manifest.scan()
+
+    profiler = Profiler()
+
+    # every run starts with the memo of the last run using the cache
+    Hint.clear_instances()
+    hint_memo.clear()
+
+    if cache_directory:
+        hint_memo.load(cache_directory.joinpath(MEMO_NAME))
+
+    # hints that can not be parsed are collected instead of asked for,
+    # the answers of the worklist file are added to the memo
+    worklist: Optional[Worklist] = None
+
+    if worklist_file:
+        worklist = Worklist.load(worklist_file, hint_memo)
+        worklist.interactive = not silent
+
+        silent = True
+
+    # hash overrides before they are rewritten at the end of the run
+    cache: Optional[BuildCache] = None
+
+    if cache_directory:
+        cache = BuildCache(
+            cache_directory,
+            [classes_file, functions_file],
             silent,
         )
 
-        module_instance = Module(
-            module_name,
-            constants=constant_instances,
-            classes=class_instances,
-            functions=function_instances,
-            is_init_file="__init__" in str(file),
+    # load overrides
+    with profiler.phase("overrides"):
+        overrides = OverrideRegistry(
+            load_classes(classes_file, cache_directory),
+            load_functions(functions_file, cache_directory),
         )
 
-        for class_instance in class_instances:
-            classes_lookup[class_instance.name] = module_instance.name
-
-        modules.append(module_instance)
-
-    # module_names = [x.module_name for x in modules]
-    # module_paths = [x.module_path for x in modules]
-
-    # update type hints
-    for module_instance in modules:
-        for hint_instance in module_instance.get_hints():
-            if hint_instance.name:
-                parts = hint_instance.name.split(".")
-                class_name = parts[-1]
-
-                if class_name in classes_lookup:
-                    # class name exists in classes lookup
-                    class_module_name = classes_lookup[class_name]
-
-                    if class_module_name != module_instance.name:
-                        # add class module name to list of imports
-                        # if class is from different module
-                        import_names = [
-                            x.name for x in module_instance.imports
-                        ]
-
-                        if class_name not in import_names:
-                            module_instance.imports.append(
-                                Import(class_name, class_module_name)
-                            )
-
-                    # change hint to class name
-                    hint_instance.name = class_name
-
-    # update imports
-    for module_instance in modules:
-        if module_instance.name == "c4d":
-            module_instance.imports.append(Import("*", "c4d.symbols"))
-
-        # update imports from direct submodules
-        direct_submodules: List[str] = []
-
-        for module_name in classes_lookup.values():
-            if module_name.startswith(module_instance.name):
-                module_name = module_name.replace(module_instance.name, "")
-
-                submodule_parts = list(filter(bool, module_name.split(".")))
-
-                if submodule_parts:
-                    submodule_name = submodule_parts[0]
+    # gather files
+    with profiler.phase("discovery"):
+        files = find_sources(src_directory)
+
+    if streaming:
+        with StagedDirectory(
+            destination_directory, writers, profiler
+        ) as staged_directory:
+            stream_modules(
+                files,
+                src_directory,
+                staged_directory,
+                overrides,
+                profiler,
+                silent,
+                cache,
+                shard_size,
+                docstrings,
+                worklist,
+            )
+
+        if cache:
+            cache.save()
+
+            print(f"Cache: {cache.hits} hits, {cache.misses} misses")
+    else:
+        staged_directory = convert_modules(
+            files,
+            src_directory,
+            destination_directory,
+            overrides,
+            profiler,
+            silent,
+            jobs,
+            cache,
+            shard_size,
+            docstrings,
+            writers,
+            worklist,
+        )
 
-                    if submodule_name not in direct_submodules:
-                        direct_submodules.append(submodule_name)
+    print(
+        f"Updated {len(staged_directory.changed_files)}"
+        f" of {staged_directory.file_count} modules"
+    )
 
-                        module_instance.imports.append(
-                            Import(submodule_name, module_instance.name)
-                        )
+    with profiler.phase("store"):
+        store_classes(classes_file, overrides.classes)
 
-        # update imports from class bases
-        for class_instance in module_instance.classes:
-            for index, base in enumerate(class_instance.bases):
-                parts = base.split(".")
-                class_name = parts[-1]
+        store_functions(functions_file, overrides.functions)
 
-                if class_name in classes_lookup:
-                    # class name exists in classes lookup
-                    class_module_name = classes_lookup[class_name]
+        if worklist and worklist_file:
+            worklist.save(worklist_file)
 
-                    if class_module_name != module_instance.name:
-                        # add class module name to list of imports
-                        # if class is from different module
-                        import_names = [
-                            x.name for x in module_instance.imports
-                        ]
+        if cache_directory:
+            hint_memo.save(cache_directory.joinpath(MEMO_NAME))
 
-                        if class_name not in import_names:
-                            module_instance.imports.append(
-                                Import(class_name, class_module_name)
-                            )
+        manifest.save(staged_directory.file_sizes)
 
-                    class_instance.bases[index] = class_name
+    print(
+        f"Hint memo: {hint_memo.hits} hits, {hint_memo.misses} misses,"
+        f" {hint_memo.hit_rate:.1%} hit rate"
+    )
 
-    # save modules
-    for module_instance in modules:
-        name_length = len(module_instance.name)
-        line_length = 78
-        padding_left = int(floor(line_length * 0.5) - floor(name_length * 0.5))
-        padding_right = line_length - padding_left - name_length
-
-        print("╔" + "═" * line_length + "╗")
+    if worklist:
         print(
-            "║"
-            + " " * padding_left
-            + module_instance.name
-            + " " * padding_right
-            + "║"
-        )
-        print("╚" + "═" * line_length + "╝")
-
-        print(f"Constants: {len(module_instance.constants)}")
-        print(f"Classes: {len(module_instance.classes)}")
-        print(f"Functions: {len(module_instance.functions)}")
-
-        destination_file = destination_directory.joinpath(
-            module_instance.file_path
+            f"Worklist: {len(worklist.entries)} unresolved hints,"
+            f" {worklist.answered_count} answered"
         )
 
-        if not destination_file.parent.is_dir():
-            os.makedirs(destination_file.parent, mode=0o777, exist_ok=True)
-
-        with open(destination_file, "w") as f:
-            header = "from __future__ import annotations\n"
-            header += "from typing import List, Dict, Tuple, Union, Optional, Callable, Any, Iterable\n"
-            header += "\n"
-
-            f.write(header)
-
-            f.write(module_instance.render())
-
-    store_classes(classes_file, class_overrides)
+    if profile_file:
+        profiler.save(profile_file)
 
-    store_functions(functions_file, function_overrides)
+        profiler.print_summary()
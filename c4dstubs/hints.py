@@ -0,0 +1,100 @@
+import re
+
+from typing import List, Optional, Tuple
+from c4dstubs.signatures import Hint
+
+# names, spaces and single brackets or commas, other whitespace is part
+# of names and stripped from their ends
+TOKEN_PATTERN = re.compile(r"(?P<space> +)|(?P<bracket>[\[\],])|[^ \[\],]+")
+
+
+def hint_error(message: str, hint_string: str, position: int) -> Exception:
+    return Exception(f"{message} at position {position} in '{hint_string}'")
+
+
+def hint_name(text: str) -> str:
+    return text.strip().strip(".")
+
+
+def parent_hint_name(text: str) -> str:
+    # the start of names followed by brackets is stripped twice
+    return hint_name(text.lstrip().lstrip("."))
+
+
+def parse_hint_string(hint_string: str) -> Hint:
+    hint_string = hint_string.strip().strip(".")
+
+    if "[" not in hint_string and "]" not in hint_string:
+        return Hint(hint_string)
+
+    # names, children and positions of the currently open brackets
+    stack: List[Tuple[str, List[Hint], int]] = []
+
+    name = ""
+    empty = True
+
+    # hint of the current element once its closing bracket has been read
+    closed: Optional[Hint] = None
+
+    for match in TOKEN_PATTERN.finditer(hint_string):
+        kind = match.lastgroup
+        text = match.group()
+
+        if kind == "space":
+            # spaces are ignored within brackets
+            # but must not be part of the outermost name
+            if not stack and closed is None:
+                raise hint_error("Illegal space", hint_string, match.start())
+        elif kind is None or (text == "," and not stack):
+            # anything behind a closing bracket is ignored
+            if closed is None:
+                name += text
+                empty = False
+        elif text == "[":
+            if closed is None:
+                stack.append((name, [], match.start()))
+
+                name = ""
+                empty = True
+            elif stack:
+                raise hint_error("Unexpected '['", hint_string, match.start())
+        elif text == ",":
+            # empty hints before a comma are kept
+            stack[-1][1].append(
+                closed if closed is not None else Hint(hint_name(name))
+            )
+
+            name = ""
+            empty = True
+            closed = None
+        else:
+            if not stack:
+                raise hint_error(
+                    "Missing opening bracket", hint_string, match.start()
+                )
+
+            parent_name, children, _ = stack.pop()
+
+            # empty hints before a closing bracket are dropped
+            if closed is not None:
+                children.append(closed)
+            elif not empty:
+                children.append(Hint(hint_name(name)))
+
+            # the outermost name has been stripped with the whole hint
+            closed = Hint(
+                (
+                    parent_hint_name(parent_name)
+                    if stack
+                    else hint_name(parent_name)
+                ),
+                children,
+            )
+
+            name = ""
+            empty = True
+
+    if stack:
+        raise hint_error("Missing closing bracket", hint_string, stack[-1][2])
+
+    return closed  # type: ignore
@@ -0,0 +1,172 @@
+import os
+import json
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from c4dstubs.cache import hash_file, tool_fingerprint
+
+# kept in the destination next to the stubs it describes
+BUILD_MANIFEST_NAME = ".c4dstubs.json"
+
+
+def source_fingerprints(
+    src_directory: Path, previous: Optional[Dict[str, List[Any]]] = None
+) -> Dict[str, List[Any]]:
+    # modification time, size and hash of the source files by their path
+    # relative to the source directory, files whose modification time and
+    # size did not change keep their previous hash
+    if previous is None:
+        previous = {}
+
+    result: Dict[str, List[Any]] = {}
+
+    for root, _, filenames in os.walk(src_directory.joinpath("c4d")):
+        root_path = Path(root)
+
+        for filename in filenames:
+            file = root_path.joinpath(filename)
+            stat = file.stat()
+
+            name = file.relative_to(src_directory).as_posix()
+            entry = previous.get(name)
+
+            if entry and entry[:2] == [stat.st_mtime_ns, stat.st_size]:
+                result[name] = entry
+            else:
+                result[name] = [
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    hash_file(file),
+                ]
+
+    return result
+
+
+def remove_build_manifest(destination_directory: Path) -> None:
+    # stubs written by other means are not described by the manifest
+    try:
+        os.remove(destination_directory.joinpath(BUILD_MANIFEST_NAME))
+    except FileNotFoundError:
+        pass
+
+
+class BuildManifest:
+    # fingerprints of the sources, overrides, options and converter of the
+    # last build together with the sizes of the stubs it wrote, only uses
+    # the standard library so it is cheap to check before importing the
+    # converter
+    def __init__(
+        self,
+        src_directory: Path,
+        destination_directory: Path,
+        classes_file: Path,
+        functions_file: Path,
+        silent: bool = True,
+        shard_size: Optional[int] = None,
+        docstrings: str = "full",
+        worklist_file: Optional[Path] = None,
+    ) -> None:
+        self.src_directory = src_directory
+        self.destination_directory = destination_directory
+
+        # answers of the worklist change hints just like overrides
+        self.override_files = [classes_file, functions_file]
+
+        if worklist_file:
+            self.override_files.append(worklist_file)
+
+        self.options = {
+            "silent": silent,
+            "shard_size": shard_size,
+            "docstrings": docstrings,
+            "worklist": str(worklist_file) if worklist_file else None,
+        }
+
+        self.sources: Dict[str, List[Any]] = {}
+
+    @property
+    def file(self) -> Path:
+        return self.destination_directory.joinpath(BUILD_MANIFEST_NAME)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def scan(self) -> None:
+        # fingerprints the sources as they are read by the build
+        data = self.load()
+
+        self.sources = source_fingerprints(
+            self.src_directory, data["sources"] if data else None
+        )
+
+    def override_hashes(self) -> Dict[str, str]:
+        return {str(x): hash_file(x) for x in self.override_files}
+
+    def check(self) -> Optional[str]:
+        # returns why the stubs are out of date or None if they are current,
+        # cheap comparisons go first
+        data = self.load()
+
+        if data is None:
+            return "no manifest of a previous build"
+
+        if data["options"] != self.options:
+            return "options changed"
+
+        if data["overrides"] != self.override_hashes():
+            return "overrides changed"
+
+        for name, size in data["stubs"].items():
+            try:
+                if (
+                    self.destination_directory.joinpath(name).stat().st_size
+                    != size
+                ):
+                    return f"stub '{name}' modified"
+            except OSError:
+                return f"stub '{name}' missing"
+
+        sources = source_fingerprints(self.src_directory, data["sources"])
+
+        if sources.keys() != data["sources"].keys():
+            return "sources added or removed"
+
+        for name, entry in sources.items():
+            if entry[2] != data["sources"][name][2]:
+                return f"source '{name}' changed"
+
+        if data["tool"] != tool_fingerprint():
+            return "converter changed"
+
+        return None
+
+    def save(self, stub_sizes: Dict[Path, int]) -> None:
+        # overrides are hashed as rewritten by the build
+        data = {
+            "tool": tool_fingerprint(),
+            "options": self.options,
+            "overrides": self.override_hashes(),
+            "sources": self.sources,
+            "stubs": {x.as_posix(): y for x, y in sorted(stub_sizes.items())},
+        }
+
+        content = json.dumps(data, indent=1)
+
+        # an unchanged build leaves the destination untouched
+        try:
+            with open(self.file, "r") as f:
+                if f.read() == content:
+                    return
+        except OSError:
+            pass
+
+        temporary_file = self.file.with_name(f"{self.file.name}.tmp")
+
+        with open(temporary_file, "w") as f:
+            f.write(content)
+
+        os.replace(temporary_file, self.file)
@@ -0,0 +1,100 @@
+import os
+import pickle
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from c4dstubs.signatures import Hint
+from c4dstubs.cache import tool_fingerprint
+from c4dstubs.profiling import counters
+
+MEMO_NAME = "hints.memo"
+
+# parsed hint or the message of the error parsing it
+MemoEntry = Tuple[Optional[Hint], Optional[str]]
+
+
+class HintMemo:
+    # raw hints of docstrings are parsed once per run and, if the memo is
+    # saved, once per version of the converter
+    def __init__(self) -> None:
+        self.entries: Dict[str, MemoEntry] = {}
+
+        # hints users answered for raw hints that can not be parsed, the
+        # only store of answers, they are kept in the worklist file and
+        # not saved with the memo
+        self.answers: Dict[str, str] = {}
+
+        # entries added since the last call of take_additions
+        self.additions: Dict[str, MemoEntry] = {}
+
+    @property
+    def hits(self) -> int:
+        return counters["hint_memo_hits"]
+
+    @property
+    def misses(self) -> int:
+        return counters["hint_memo_misses"]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, hint: str) -> Optional[MemoEntry]:
+        return self.entries.get(hint)
+
+    def add(self, hint: str, entry: MemoEntry) -> None:
+        self.entries[hint] = entry
+        self.additions[hint] = entry
+
+    def add_answer(self, hint: str, answer: str) -> None:
+        self.answers[hint] = answer
+
+    def take_additions(self) -> Dict[str, MemoEntry]:
+        result = self.additions
+
+        self.additions = {}
+
+        return result
+
+    def merge(self, entries: Dict[str, MemoEntry]) -> None:
+        # entries of worker processes
+        self.entries.update(entries)
+
+    def clear(self) -> None:
+        self.entries = {}
+        self.answers = {}
+        self.additions = {}
+
+    def save(self, file: Path) -> None:
+        if not file.parent.is_dir():
+            os.makedirs(file.parent, mode=0o777, exist_ok=True)
+
+        data = {"tool": tool_fingerprint(), "entries": self.entries}
+
+        temporary_file = file.with_name(f"{file.name}.tmp")
+
+        with open(temporary_file, "wb") as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporary_file, file)
+
+    def load(self, file: Path) -> None:
+        # replaces the memo, parsed hints of other versions of the
+        # converter are dropped
+        self.clear()
+
+        try:
+            with open(file, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+
+        if data.get("tool") == tool_fingerprint():
+            self.entries = data["entries"]
+
+
+# memo of the current process, workers send their additions back together
+# with their results
+hint_memo = HintMemo()
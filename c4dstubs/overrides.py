@@ -1,69 +1,115 @@
+import os
+import pickle
 import yaml
 
-from typing import List, Dict, Union, Any
+from typing import Callable, List, Dict, Optional, Union, Any
 from pathlib import Path
 from c4dstubs.signatures import Class, Function, Argument, Hint
+from c4dstubs.hints import parse_hint_string
+from c4dstubs.cache import hash_bytes, tool_fingerprint
+from c4dstubs.files import write_if_changed
 
+# use libyaml if available
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper  # type: ignore
+
+OVERRIDES_SUFFIX = ".overrides"
 
-def deserialize_hint(hint_string: str) -> Hint:
-    hint_string = hint_string.strip()
 
-    hint_string = hint_string.strip(".")
+class OverrideRegistry:
+    def __init__(
+        self,
+        classes: Optional[List[Class]] = None,
+        functions: Optional[List[Function]] = None,
+    ) -> None:
+        if classes is None:
+            classes = []
 
-    # handle nested definitions in brackets
-    opening_bracket_index = hint_string.find("[")
-    closing_bracket_index = hint_string[::-1].find("]")
+        if functions is None:
+            functions = []
 
-    if opening_bracket_index > -1 or closing_bracket_index > -1:
-        # we have opening and or closing brackets
-        if opening_bracket_index > -1 and closing_bracket_index > -1:
-            # opening and closing brackets are present
-            start = opening_bracket_index + 1
-            stop = len(hint_string) - closing_bracket_index - 1
+        # overrides in insertion order as they are stored
+        self.classes: List[Class] = []
+        self.functions: List[Function] = []
 
-            hint_substring = hint_string[start:stop]
+        # lookups by name, the first override of a name wins
+        self.class_lookup: Dict[str, Class] = {}
+        self.function_lookup: Dict[str, Function] = {}
+        self.method_lookups: Dict[str, Dict[str, Function]] = {}
 
-            hint_name_string = hint_string[: start - 1]
+        # methods recorded for classes without override
+        self.pending_methods: Dict[str, List[Function]] = {}
 
-            if " " in hint_name_string:
-                raise Exception(f"Illegal space in '{hint_string}'")
+        for class_instance in classes:
+            self.add_class(class_instance)
 
-            # create hint instance from hint name string
-            hint_instance = deserialize_hint(hint_name_string)
+        for function_instance in functions:
+            self.add_function(function_instance)
 
-            # figure out what to do with substring
-            nested_levels = 0
+    def get_class(self, name: str) -> Optional[Class]:
+        return self.class_lookup.get(name)
 
-            buffer = ""
+    def get_function(self, name: str) -> Optional[Function]:
+        return self.function_lookup.get(name)
 
-            for character in hint_substring:
-                if character == " ":
-                    continue
+    def get_method(self, class_name: str, name: str) -> Optional[Function]:
+        method_lookup = self.method_lookups.get(class_name)
 
-                if nested_levels == 0:
-                    if character == ",":
-                        hint_instance.children.append(deserialize_hint(buffer))
+        if method_lookup is None:
+            return None
 
-                        buffer = ""
+        return method_lookup.get(name)
 
-                        continue
+    def add_class(self, class_instance: Class) -> None:
+        self.classes.append(class_instance)
 
-                if character == "[":
-                    nested_levels += 1
+        if class_instance.name not in self.class_lookup:
+            self.class_lookup[class_instance.name] = class_instance
 
-                if character == "]":
-                    nested_levels = max(nested_levels - 1, 0)
+            method_lookup = self.method_lookups.setdefault(
+                class_instance.name, {}
+            )
 
-                buffer += character
+            for function_instance in class_instance.functions:
+                method_lookup.setdefault(
+                    function_instance.name, function_instance
+                )
 
-            if buffer:
-                hint_instance.children.append(deserialize_hint(buffer))
+    def add_function(self, function_instance: Function) -> None:
+        self.functions.append(function_instance)
+
+        self.function_lookup.setdefault(
+            function_instance.name, function_instance
+        )
 
-            return hint_instance
+    def add_method(self, class_name: str, function_instance: Function) -> None:
+        class_instance = self.class_lookup.get(class_name)
+
+        if class_instance:
+            class_instance.functions.append(function_instance)
         else:
-            raise Exception(f"Missing bracket counterpart in '{hint_string}'")
-    else:
-        return Hint(hint_string)
+            # stored with the class once it has been parsed completely
+            self.pending_methods.setdefault(class_name, []).append(
+                function_instance
+            )
+
+        self.method_lookups.setdefault(class_name, {}).setdefault(
+            function_instance.name, function_instance
+        )
+
+    def pop_pending_methods(self, class_name: str) -> List[Function]:
+        result = self.pending_methods.pop(class_name, [])
+
+        if class_name not in self.class_lookup:
+            self.method_lookups.pop(class_name, None)
+
+        return result
+
+
+def deserialize_hint(hint_string: str) -> Hint:
+    return parse_hint_string(hint_string)
 
 
 def deserialize_argument(argument_string: str) -> Argument:
@@ -121,7 +167,7 @@ def serialize_class(
     functions: Dict[str, List[str]] = {}
 
     for function_instance in class_instance.functions:
-        functions = {**functions, **serialize_function(function_instance)}
+        functions.update(serialize_function(function_instance))
 
     return {
         class_instance.name
@@ -187,50 +233,90 @@ def deserialize_functions(data: Dict[str, Any]) -> List[Function]:
     return result
 
 
-def load_classes(
+def load_overrides(
     file: Path,
-) -> List[Class]:
-    result: List[Class] = []
+    deserialize: Callable[[Dict[str, Any]], List[Any]],
+    cache_directory: Optional[Path] = None,
+) -> List[Any]:
+    if not file.is_file():
+        return []
 
-    if file.is_file():
-        with open(file, "r") as f:
-            data = yaml.safe_load(f)
+    with open(file, "rb") as f:
+        content = f.read()
 
-            result = deserialize_classes(data)
+    cache_file: Optional[Path] = None
 
-    return result
+    if cache_directory:
+        # deserialized overrides are cached by the hash of the file
+        # and of the converter sources
+        key = hash_bytes(tool_fingerprint().encode() + content)
 
+        cache_file = cache_directory.joinpath(
+            f"{file.stem}-{key}{OVERRIDES_SUFFIX}"
+        )
 
-def load_functions(file: Path) -> List[Function]:
-    result: List[Function] = []
+        if cache_file.is_file():
+            try:
+                with open(cache_file, "rb") as f:
+                    return pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+
+    result = deserialize(yaml.load(content, Loader=SafeLoader))
+
+    if cache_file:
+        if not cache_file.parent.is_dir():
+            os.makedirs(cache_file.parent, mode=0o777, exist_ok=True)
+
+        temporary_file = cache_file.with_name(f"{cache_file.name}.tmp")
+
+        with open(temporary_file, "wb") as f:
+            pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
 
-    if file.is_file():
-        with open(file, "r") as f:
-            data = yaml.safe_load(f)
+        os.replace(temporary_file, cache_file)
 
-            result = deserialize_functions(data)
+        # remove caches of previous versions of the file
+        for stale_file in cache_file.parent.glob(
+            f"{file.stem}-*{OVERRIDES_SUFFIX}"
+        ):
+            if stale_file != cache_file:
+                os.remove(stale_file)
 
     return result
 
 
-def store_classes(file: Path, class_instances: List[Class]) -> None:
-    with open(file, "w") as f:
-        data: Dict[str, Any] = {}
+def load_classes(
+    file: Path, cache_directory: Optional[Path] = None
+) -> List[Class]:
+    return load_overrides(file, deserialize_classes, cache_directory)
+
+
+def load_functions(
+    file: Path, cache_directory: Optional[Path] = None
+) -> List[Function]:
+    return load_overrides(file, deserialize_functions, cache_directory)
 
-        for class_instance in class_instances:
-            data = {**data, **serialize_class(class_instance)}
 
-        yaml.safe_dump(data, f, width=1000)  # type: ignore
+def store_classes(file: Path, class_instances: List[Class]) -> bool:
+    data: Dict[str, Any] = {}
 
+    for class_instance in class_instances:
+        data.update(serialize_class(class_instance))
+
+    return write_if_changed(
+        file, yaml.dump(data, Dumper=SafeDumper, width=1000)  # type: ignore
+    )
 
-def store_functions(file: Path, function_instances: List[Function]) -> None:
-    with open(file, "w") as f:
-        data: Dict[str, Any] = {}
 
-        for function_instance in function_instances:
-            data = {**data, **serialize_function(function_instance)}
+def store_functions(file: Path, function_instances: List[Function]) -> bool:
+    data: Dict[str, Any] = {}
 
-        yaml.safe_dump(data, f, width=1000)  # type: ignore
+    for function_instance in function_instances:
+        data.update(serialize_function(function_instance))
+
+    return write_if_changed(
+        file, yaml.dump(data, Dumper=SafeDumper, width=1000)  # type: ignore
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,283 @@
+import io
+import time
+import pickle
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from c4dstubs.signatures import Class, Function, Constant
+from c4dstubs.parsers import parse_file
+from c4dstubs.cache import BuildCache
+from c4dstubs.overrides import OverrideRegistry
+from c4dstubs.profiling import Profiler, counters
+from c4dstubs.memo import MemoEntry, hint_memo
+
+ParseResult = Tuple[List[Constant], List[Class], List[Function]]
+
+# override objects by their index in the traversal or by any other key
+OverrideObjects = Union[List[Any], Dict[Any, Any]]
+
+# state of a worker process, set once by the pool initializer
+_class_overrides: List[Class] = []
+_function_overrides: List[Function] = []
+_fail_silently: bool = True
+
+
+def collect_override_objects(
+    class_overrides: List[Class], function_overrides: List[Function]
+) -> List[Any]:
+    # workers and the main process build the same list from their own
+    # copies of the overrides, so an index identifies the same object,
+    # hints are immutable and interned again when unpickled
+    result: List[Any] = []
+    seen: Set[int] = set()
+
+    pending: List[Any] = [*class_overrides, *function_overrides][::-1]
+
+    while pending:
+        instance = pending.pop()
+
+        if isinstance(instance, str) or id(instance) in seen:
+            continue
+
+        seen.add(id(instance))
+        result.append(instance)
+
+        children: List[Any] = []
+
+        if isinstance(instance, list):
+            children = instance
+        elif isinstance(instance, Class):
+            children = [
+                instance.bases,
+                instance.attributes,
+                instance.functions,
+            ]
+        elif isinstance(instance, Function):
+            children = [instance.arguments]
+
+        pending.extend(children[::-1])
+
+    return result
+
+
+class _ResultPickler(pickle.Pickler):
+    def __init__(self, file: io.BytesIO, objects: OverrideObjects) -> None:
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+
+        items = (
+            objects.items()
+            if isinstance(objects, dict)
+            else enumerate(objects)
+        )
+
+        self.object_keys: Dict[int, Any] = {id(x): key for key, x in items}
+
+    def persistent_id(self, obj: Any) -> Optional[Any]:
+        return self.object_keys.get(id(obj))
+
+
+class _ResultUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, objects: OverrideObjects) -> None:
+        super().__init__(file)
+
+        self.objects = objects
+
+    def persistent_load(self, pid: Any) -> Any:
+        return self.objects[pid]
+
+
+def _initialize_worker(
+    class_overrides: List[Class],
+    function_overrides: List[Function],
+    fail_silently: bool,
+    memo_entries: Dict[str, MemoEntry],
+) -> None:
+    global _class_overrides, _function_overrides, _fail_silently
+
+    _class_overrides = class_overrides
+    _function_overrides = function_overrides
+    _fail_silently = fail_silently
+
+    hint_memo.entries = memo_entries
+    hint_memo.additions = {}
+
+
+def serialize_result(
+    result: Tuple[
+        List[Constant],
+        List[Class],
+        List[Function],
+        List[Class],
+        List[Function],
+    ],
+    objects: OverrideObjects,
+) -> bytes:
+    # references to existing overrides are pickled by index
+    # so the receiver can substitute its own instances
+    buffer = io.BytesIO()
+
+    _ResultPickler(buffer, objects).dump(result)
+
+    return buffer.getvalue()
+
+
+def deserialize_result(
+    data: bytes, objects: OverrideObjects
+) -> Tuple[
+    List[Constant], List[Class], List[Function], List[Class], List[Function]
+]:
+    return _ResultUnpickler(io.BytesIO(data), objects).load()
+
+
+def _parse_file_worker(
+    file: Path,
+) -> Tuple[bytes, float, Dict[str, int], Dict[str, MemoEntry]]:
+    # returns the serialized result along with the time spent, the
+    # events counted and the hints memoized while parsing the file
+    counters.clear()
+
+    start = time.perf_counter()
+
+    # every file starts from the initial overrides
+    overrides = OverrideRegistry(_class_overrides, _function_overrides)
+
+    # overrides must be collected before parsing so that the traversal
+    # matches the one of the main process
+    objects = collect_override_objects(overrides.classes, overrides.functions)
+
+    constants: List[Constant] = []
+    classes: List[Class] = []
+    functions: List[Function] = []
+
+    parse_file(file, constants, classes, functions, overrides, _fail_silently)
+
+    data = serialize_result(
+        (
+            constants,
+            classes,
+            functions,
+            overrides.classes[len(_class_overrides) :],
+            overrides.functions[len(_function_overrides) :],
+        ),
+        objects,
+    )
+
+    return (
+        data,
+        time.perf_counter() - start,
+        dict(counters),
+        hint_memo.take_additions(),
+    )
+
+
+def parse_files(
+    files: List[Path],
+    overrides: OverrideRegistry,
+    fail_silently: bool = False,
+    jobs: int = 1,
+    cache: Optional[BuildCache] = None,
+    profiler: Optional[Profiler] = None,
+) -> List[ParseResult]:
+    result: List[ParseResult] = []
+
+    if not fail_silently:
+        # results that depend on user input must not be reused
+        cache = None
+
+    objects = collect_override_objects(overrides.classes, overrides.functions)
+
+    # serialized results of cached or concurrently parsed files
+    parsed: Dict[Path, bytes] = {}
+
+    # time spent on each file by workers
+    file_times: Dict[Path, float] = {}
+
+    if cache:
+        for file in files:
+            data = cache.load(file)
+
+            if data is not None:
+                parsed[file] = data
+
+    missing_files = [x for x in files if x not in parsed]
+
+    if jobs > 1 and len(missing_files) > 1 and fail_silently:
+        # user input can not be requested from worker processes
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(missing_files)),
+            initializer=_initialize_worker,
+            initargs=(
+                overrides.classes,
+                overrides.functions,
+                fail_silently,
+                hint_memo.entries,
+            ),
+        ) as executor:
+            for file, (data, seconds, worker_counters, memo_entries) in zip(
+                missing_files, executor.map(_parse_file_worker, missing_files)
+            ):
+                parsed[file] = data
+                file_times[file] = seconds
+
+                counters.update(worker_counters)
+
+                hint_memo.merge(memo_entries)
+
+                if cache:
+                    cache.store(file, data)
+
+    for file in files:
+        start = time.perf_counter()
+
+        if file not in parsed:
+            constants: List[Constant] = []
+            classes: List[Class] = []
+            functions: List[Function] = []
+
+            parse_file(
+                file, constants, classes, functions, overrides, fail_silently
+            )
+
+            if cache:
+                cache.store(
+                    file,
+                    serialize_result(
+                        (constants, classes, functions, [], []), objects
+                    ),
+                )
+
+            result.append((constants, classes, functions))
+
+            if profiler:
+                profiler.add_file("parse", file, time.perf_counter() - start)
+
+            continue
+
+        (
+            constants,
+            classes,
+            functions,
+            class_additions,
+            function_additions,
+        ) = deserialize_result(parsed[file], objects)
+
+        # merge overrides in file order
+        for class_instance in class_additions:
+            if overrides.get_class(class_instance.name) is None:
+                overrides.add_class(class_instance)
+
+        for function_instance in function_additions:
+            if overrides.get_function(function_instance.name) is None:
+                overrides.add_function(function_instance)
+
+        result.append((constants, classes, functions))
+
+        if profiler:
+            profiler.add_file(
+                "parse",
+                file,
+                file_times.get(file, 0.0) + time.perf_counter() - start,
+            )
+
+    return result
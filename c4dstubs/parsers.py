@@ -2,14 +2,123 @@ from __future__ import annotations
 
 import ast
 import re
+import keyword
 
 from pathlib import Path
-from typing import Dict, Tuple, Optional, List
-from c4dstubs.signatures import Class, Function, Argument, Hint
-from c4dstubs.overrides import deserialize_hint
+from typing import Dict, Tuple, Optional, List, Set
+from c4dstubs.signatures import (
+    Class,
+    Function,
+    Argument,
+    Hint,
+    ConstantTable,
+    Constant,
+)
+from c4dstubs.overrides import OverrideRegistry, deserialize_hint
+from c4dstubs.profiling import count
+from c4dstubs.memo import HintMemo, hint_memo
+from c4dstubs.docstrings import (
+    DocstringField,
+    normalize_docstring,
+    extract_fields,
+)
+
+# lines of modules that only define constants, simple assignments with
+# a single literal or name, imports, comments and empty lines
+CONSTANT_LINE_PATTERN = re.compile(
+    r"(?:"
+    r"(?P<name>[A-Za-z_]\w*)[ \t]*"
+    r"(?:"
+    r":[ \t]*(?P<annotation>[A-Za-z_][\w.]*)[ \t]*(?:=[ \t]*(?P<value>"
+    r"-?(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)"
+    r"|\.\.\.|(?P<value_name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)"
+    r"|'[^'\\\n]*'|\"[^\"\\\n]*\"))?"
+    r"|=[ \t]*(?P<assigned_value>"
+    r"-?(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)"
+    r"|\.\.\.|(?P<assigned_name>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)"
+    r"|'[^'\\\n]*'|\"[^\"\\\n]*\")"
+    r")[ \t]*"
+    r"|(?:from[ \t]+[\w.]+[ \t]+)?import[ \t]+[\w., \t]+"
+    r")?(?:#[^\n]*)?\r?"
+)
+
+# names that may be used as values although they are keywords
+CONSTANT_KEYWORDS = {"None", "True", "False"}
+
+
+def scan_constants(source: str) -> Optional[List[str]]:
+    # names of the constants of a module that only defines constants
+    # or None if the module has to be parsed
+    result: List[str] = []
+
+    for line in source.split("\n"):
+        match = CONSTANT_LINE_PATTERN.fullmatch(line)
+
+        if match is None:
+            return None
+
+        name = match["name"]
+
+        if name is None:
+            continue
+
+        for part in (
+            name,
+            match["annotation"],
+            match["value_name"] or match["assigned_name"],
+        ):
+            if part is None:
+                continue
+
+            for word in part.split("."):
+                if keyword.iskeyword(word) and word not in CONSTANT_KEYWORDS:
+                    return None
+
+        result.append(name)
+
+    return result
+
+
+# class statements at the top level of a module
+CLASS_PATTERN = re.compile(r"^class[ \t]+([A-Za-z_]\w*)", re.MULTILINE)
+
+
+def scan_class_names(source: str) -> List[str]:
+    # names of the classes a module defines in the order they are defined,
+    # class statements in multiline strings are matched as well
+    return list(dict.fromkeys(CLASS_PATTERN.findall(source)))
+
+
+def parse_hint(hint: str, memo: Optional[HintMemo] = None) -> Hint:
+    # parses every raw hint once, errors are raised again
+    if memo is None:
+        memo = hint_memo
+
+    entry = memo.get(hint)
+
+    if entry is None:
+        count("hint_memo_misses")
+
+        try:
+            entry = (_parse_hint(hint), None)
+        except Exception as e:
+            entry = (None, str(e))
+
+        memo.add(hint, entry)
+    else:
+        count("hint_memo_hits")
+
+    hint_instance, error = entry
+
+    if hint_instance is None:
+        raise Exception(error)
+
+    return hint_instance
 
 
-def parse_hint(hint: str) -> Hint:
+def _parse_hint(hint: str) -> Hint:
+    count("hints_parsed")
+
     hint = hint.strip()
 
     if not hint:
@@ -75,31 +184,59 @@ def parse_hint(hint: str) -> Hint:
             f"Illeagal whitespace in hint without brackets '{hint}'"
         )
 
-    hint_result = deserialize_hint(hint)
-
-    for hint_instance in hint_result.get_hints():
-        if hint_instance.name == "Dict":
-            if len(hint_instance.children) != 2:
-                hint_instance.children = [Hint("str"), Hint("Any")]
-        elif hint_instance.name == "List":
-            if len(hint_instance.children) != 1:
-                hint_instance.children = [Hint("Any")]
+    hint_result = fix_hint_children(deserialize_hint(hint))
 
     if hint_result.children and not hint_result.name:
-        hint_result.name = "Union"
+        hint_result = Hint("Union", hint_result.children)
 
     return hint_result
 
 
+def fix_hint_children(hint_instance: Hint) -> Hint:
+    if hint_instance.name == "Dict":
+        if len(hint_instance.children) != 2:
+            return Hint("Dict", [Hint("str"), Hint("Any")])
+    elif hint_instance.name == "List":
+        if len(hint_instance.children) != 1:
+            return Hint("List", [Hint("Any")])
+
+    if not hint_instance.children:
+        return hint_instance
+
+    return Hint(
+        hint_instance.name,
+        [fix_hint_children(x) for x in hint_instance.children],
+    )
+
+
 def parse_hint_with_user_input_fallback(
-    definition: str, comment: Optional[str] = None, fail_silently: bool = False
+    definition: str,
+    comment: Optional[str] = None,
+    fail_silently: bool = False,
+    memo: Optional[HintMemo] = None,
 ) -> Tuple[Hint, int]:
+    if memo is None:
+        memo = hint_memo
+
     hint: Optional[Hint] = None
     attempts: int = 0
 
+    # answers given before are used again for the same raw hint instead of
+    # asking twice, they count as user input so the function is added to
+    # the overrides, silent runs leave unparsable hints to the worklist
+    answer = None if fail_silently else memo.answers.get(definition)
+
+    if answer is not None:
+        try:
+            return (parse_hint(answer, memo), 1)
+        except Exception:
+            pass
+
+    raw_definition = definition
+
     while hint is None:
         try:
-            hint = parse_hint(definition)
+            hint = parse_hint(definition, memo)
         except Exception as e:
             if fail_silently:
                 raise Exception(e) from e
@@ -109,46 +246,53 @@ def parse_hint_with_user_input_fallback(
                 if comment:
                     print(comment)
 
+                count("user_input_fallbacks")
+
                 definition = input("Override with: ")
 
                 attempts += 1
 
+    if attempts > 0:
+        memo.add_answer(raw_definition, definition)
+
     return (hint, attempts)
 
 
 def parse_function(
     node: ast.FunctionDef,
-    function_overrides: Optional[List[Function]] = None,
+    overrides: Optional[OverrideRegistry] = None,
     fail_silently: bool = False,
+    class_name: Optional[str] = None,
+    memo: Optional[HintMemo] = None,
 ) -> Function:
-    if function_overrides is None:
-        function_overrides = []
+    if overrides is None:
+        overrides = OverrideRegistry()
 
-    function_override_names = [x.name for x in function_overrides]
     user_input_required = False
 
     name = node.name
     arguments = [Argument(x.arg, Hint("Any")) for x in node.args.args]
-    argument_names = [x.name for x in arguments]
     return_hint = Hint("None")
     docstring = None
 
+    # fields whose hints could not be parsed silently
+    unresolved: List[DocstringField] = []
+
     # set docstring
     for body_node in node.body:
         if isinstance(body_node, ast.Expr):
             if isinstance(body_node.value, ast.Str):
-                docstring = ""
+                docstring = normalize_docstring(body_node.value.s)
 
-                for docstring_line in body_node.value.s.split("\n"):
-                    docstring += (
-                        docstring_line.strip().replace("\\", "/") + "\n"
-                    )
+    # methods are looked up in the overrides of their class
+    if class_name is not None:
+        override_instance = overrides.get_method(class_name, name)
+    else:
+        override_instance = overrides.get_function(name)
 
-    if name in function_override_names:
+    if override_instance is not None:
         # name is present in list of function overrides
-        override_instance = function_overrides[
-            function_override_names.index(name)
-        ]
+        count("override_hits")
 
         # override arguments with arguments from function override
         arguments = override_instance.arguments
@@ -159,98 +303,97 @@ def parse_function(
         # no override for this function was found
         # try and get more information about arguments
         # and return hint from docstring
-        for docstring_line in docstring.split("\n"):
-            comment = f"{name}: {docstring_line}"
-            hint_parts = list(
-                filter(bool, [x.strip() for x in docstring_line.split(":")])
-            )
+        argument_lookup: Dict[str, Argument] = {}
 
-            if len(hint_parts) == 2:
-                if hint_parts[0].startswith("type"):
-                    # found an argument hint
-                    argument_name = hint_parts[0].replace("type ", "")
-
-                    if argument_name in argument_names:
-                        argument_instance = arguments[
-                            argument_names.index(argument_name)
-                        ]
-
-                        try:
-                            (
-                                hint_result,
-                                attempts,
-                            ) = parse_hint_with_user_input_fallback(
-                                hint_parts[1], comment, fail_silently
-                            )
+        # the first argument of a name is documented
+        for argument_instance in reversed(arguments):
+            argument_lookup[argument_instance.name] = argument_instance
+
+        for field in extract_fields(docstring):
+            comment = f"{name}: {field.source}"
 
-                            argument_instance.hint = hint_result
+            if field.kind == "type":
+                # found an argument hint
+                argument_instance = argument_lookup.get(field.name)
 
-                            if attempts > 0:
-                                user_input_required = True
-                        except Exception:
-                            pass
-                elif hint_parts[0].startswith("rtype"):
-                    # found a return hint
+                if argument_instance is not None:
                     try:
                         (
                             hint_result,
                             attempts,
                         ) = parse_hint_with_user_input_fallback(
-                            hint_parts[1], comment, fail_silently
+                            field.text, comment, fail_silently, memo
                         )
 
-                        return_hint = hint_result
+                        argument_instance.hint = hint_result
 
                         if attempts > 0:
                             user_input_required = True
                     except Exception:
-                        pass
-                elif hint_parts[0].startswith("param"):
-                    # found a parameter description
-                    argument_name = hint_parts[0].replace("param ", "")
+                        count("unresolved_hints")
+
+                        unresolved.append(field)
+            elif field.kind == "rtype":
+                # found a return hint
+                try:
+                    (
+                        hint_result,
+                        attempts,
+                    ) = parse_hint_with_user_input_fallback(
+                        field.text, comment, fail_silently, memo
+                    )
+
+                    return_hint = hint_result
 
-                    if argument_name in argument_names:
-                        argument_instance = arguments[
-                            argument_names.index(argument_name)
-                        ]
+                    if attempts > 0:
+                        user_input_required = True
+                except Exception:
+                    count("unresolved_hints")
 
-                        if "optional" in hint_parts[1].lower():
-                            if argument_instance.hint.name != "Optional":
-                                # wrap hint in Optional
-                                argument_instance.hint = Hint(
-                                    "Optional", [argument_instance.hint]
-                                )
+                    unresolved.append(field)
+            else:
+                # found a parameter description
+                argument_instance = argument_lookup.get(field.name)
+
+                if argument_instance is not None:
+                    if "optional" in field.text.lower():
+                        if argument_instance.hint.name != "Optional":
+                            # wrap hint in Optional
+                            argument_instance.hint = Hint(
+                                "Optional", [argument_instance.hint]
+                            )
 
-                            argument_instance.default = True
+                        argument_instance.default = True
 
-    function_instance = Function(name, arguments, return_hint, docstring)
+    function_instance = Function(
+        name, arguments, return_hint, docstring, unresolved or None
+    )
 
     if user_input_required:
         # while defining the function user input was necessary
         # so we append the functions to the overrides list
-        function_overrides.append(function_instance)
+        if class_name is not None:
+            overrides.add_method(class_name, function_instance)
+        else:
+            overrides.add_function(function_instance)
 
     return function_instance
 
 
 def parse_class(
     node: ast.ClassDef,
-    class_overrides: Optional[List[Class]] = None,
+    overrides: Optional[OverrideRegistry] = None,
     fail_silently: bool = False,
+    memo: Optional[HintMemo] = None,
 ) -> Class:
-    if class_overrides is None:
-        class_overrides = []
-
-    class_names = [x.name for x in class_overrides]
-
-    class_override: Optional[Class] = None
+    if overrides is None:
+        overrides = OverrideRegistry()
 
     name = node.name
     bases: List[str] = []
     attributes: List[Argument] = []
     functions: List[Function] = []
 
-    attribute_overrides: List[Argument] = []
     function_overrides: List[Function] = []
 
     # get bases
@@ -258,27 +401,28 @@ def parse_class(
         if isinstance(expression, ast.Name):
             bases.append(expression.id)
 
-    if name in class_names:
+    class_override = overrides.get_class(name)
+
+    if class_override:
         # use overrides from class override
         # if name in list of class names
-        class_override = class_overrides[class_names.index(name)]
+        count("override_hits")
 
         attributes = [*class_override.attributes]
 
-        attribute_overrides = class_override.attributes
         function_overrides = class_override.functions
 
     for body_node in node.body:
         # parse functions from class body
         if isinstance(body_node, ast.FunctionDef):
             function_instance = parse_function(
-                body_node, function_overrides, fail_silently
+                body_node, overrides, fail_silently, name, memo
             )
 
             functions.append(function_instance)
 
     # add functions that have been only defined in the classs override file
-    function_names: List[str] = [x.name for x in functions]
+    function_names: Set[str] = {x.name for x in functions}
 
     for function_instance in function_overrides:
         if function_instance.name not in function_names:
@@ -287,24 +431,42 @@ def parse_class(
     class_instance = Class(name, bases, attributes, functions)
 
     if not class_override:
-        if attribute_overrides or function_overrides:
-            # append class with attribute and function overrides
-            class_overrides.append(
-                Class(name, bases, attribute_overrides, function_overrides)
-            )
+        function_overrides = overrides.pop_pending_methods(name)
+
+        if function_overrides:
+            # append class with function overrides
+            overrides.add_class(Class(name, bases, [], function_overrides))
 
     return class_instance
 
 
 def parse_file(
     file: Path,
-    constants: Optional[List[Argument]] = None,
+    constants: Optional[List[Constant]] = None,
+    classes: Optional[List[Class]] = None,
+    functions: Optional[List[Function]] = None,
+    overrides: Optional[OverrideRegistry] = None,
+    fail_silently: bool = False,
+    memo: Optional[HintMemo] = None,
+) -> None:
+    with open(file, "r") as f:
+        source = f.read()
+
+    parse_source(
+        source, constants, classes, functions, overrides, fail_silently, memo
+    )
+
+
+def parse_source(
+    source: str,
+    constants: Optional[List[Constant]] = None,
     classes: Optional[List[Class]] = None,
     functions: Optional[List[Function]] = None,
-    class_overrides: Optional[List[Class]] = None,
-    function_overrides: Optional[List[Function]] = None,
+    overrides: Optional[OverrideRegistry] = None,
     fail_silently: bool = False,
+    memo: Optional[HintMemo] = None,
 ) -> None:
+    # hints are memoized in the memo of the process unless one is given
     if constants is None:
         constants = []
 
@@ -314,40 +476,44 @@ def parse_file(
     if functions is None:
         functions = []
 
-    if class_overrides is None:
-        class_overrides = []
+    if overrides is None:
+        overrides = OverrideRegistry()
 
-    if function_overrides is None:
-        function_overrides = []
+    class_names: Set[str] = {x.name for x in classes}
 
-    with open(file, "r") as f:
-        data = ast.parse(f.read())
+    # modules like symbols only define constants, which are scanned
+    # without building a syntax tree
+    constant_names = scan_constants(source)
 
-        for node in data.body:
-            if isinstance(node, ast.AnnAssign):
-                if isinstance(node.target, ast.Name):
-                    constants.append(
-                        Argument(node.target.id, Hint("int"), True)
-                    )
-            elif isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        constants.append(
-                            Argument(target.id, Hint("int"), True)
-                        )
-            elif isinstance(node, ast.ClassDef):
-                class_instance = parse_class(
-                    node, class_overrides, fail_silently
-                )
+    if constant_names is not None:
+        if constant_names:
+            constants.append(ConstantTable(constant_names))
 
-                if class_instance.name not in [x.name for x in classes]:
-                    classes.append(class_instance)
-            elif isinstance(node, ast.FunctionDef):
-                function_instace = parse_function(
-                    node, function_overrides, fail_silently
-                )
+        return
 
-                functions.append(function_instace)
+    data = ast.parse(source)
+
+    for node in data.body:
+        if isinstance(node, ast.AnnAssign):
+            if isinstance(node.target, ast.Name):
+                constants.append(Argument(node.target.id, Hint("int"), True))
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants.append(Argument(target.id, Hint("int"), True))
+        elif isinstance(node, ast.ClassDef):
+            class_instance = parse_class(node, overrides, fail_silently, memo)
+
+            if class_instance.name not in class_names:
+                class_names.add(class_instance.name)
+
+                classes.append(class_instance)
+        elif isinstance(node, ast.FunctionDef):
+            function_instace = parse_function(
+                node, overrides, fail_silently, None, memo
+            )
+
+            functions.append(function_instace)
 
 
 if __name__ == "__main__":
@@ -373,18 +539,19 @@ if __name__ == "__main__":
 
     # function_overrides: List[Function] = load_functions(functions_file)
 
+    # overrides = OverrideRegistry(classe_overrides, function_overrides)
+
     # parse_file(
     #     file,
     #     constant_instances,
     #     class_instances,
     #     function_instances,
-    #     classe_overrides,
-    #     function_overrides,
+    #     overrides,
     # )
 
-    # store_classes(classes_file, classe_overrides)
+    # store_classes(classes_file, overrides.classes)
 
-    # store_functions(functions_file, function_overrides)
+    # store_functions(functions_file, overrides.functions)
 
     # for class_instance in class_instances:
     #     print(class_instance.render())
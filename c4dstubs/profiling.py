@@ -0,0 +1,82 @@
+import json
+import time
+
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Generator, Optional
+
+# events counted on hot paths of the current process, workers send theirs
+# back together with their results
+counters: Counter = Counter()
+
+
+def count(name: str, value: int = 1) -> None:
+    counters[name] += value
+
+
+class Profiler:
+    def __init__(self) -> None:
+        # wall time per phase and per file of a phase in seconds
+        self.phases: Dict[str, float] = {}
+        self.files: Dict[str, Dict[str, float]] = {}
+        self.start = time.perf_counter()
+
+        counters.clear()
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.phases[name] = (
+                self.phases.get(name, 0.0) + time.perf_counter() - start
+            )
+
+    def add_file(self, phase_name: str, file: Path, seconds: float) -> None:
+        files = self.files.setdefault(phase_name, {})
+
+        files[str(file)] = files.get(str(file), 0.0) + seconds
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "total": time.perf_counter() - self.start,
+            "phases": self.phases,
+            "files": self.files,
+            "counters": dict(sorted(counters.items())),
+        }
+
+    def save(self, file: Path) -> None:
+        with open(file, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def print_summary(self, file_count: int = 5) -> None:
+        report = self.report()
+
+        print(f"Total: {report['total'] * 1000:.2f} ms")
+
+        for name, seconds in self.phases.items():
+            print(f"{name:>12}{seconds * 1000:>12.2f} ms")
+
+            # slowest files of the phase
+            files = sorted(
+                self.files.get(name, {}).items(),
+                key=lambda x: x[1],
+                reverse=True,
+            )
+
+            for file, file_seconds in files[:file_count]:
+                print(f"{'':>12}{file_seconds * 1000:>12.2f} ms  {file}")
+
+        for name, value in report["counters"].items():
+            print(f"{name:>24}: {value}")
+
+
+def profile_phase(profiler: Optional[Profiler], name: str) -> ContextManager:
+    # times a phase if there is a profiler
+    if profiler:
+        return profiler.phase(name)
+
+    return nullcontext()
@@ -0,0 +1,211 @@
+from typing import Dict, List, Optional, Set, Tuple
+from c4dstubs.signatures import Hint, Import, Module
+from c4dstubs.profiling import Profiler, count, profile_phase
+
+
+class ModuleNode:
+    __slots__ = ("children",)
+
+    def __init__(self) -> None:
+        # submodule names in the order they have been added
+        self.children: Dict[str, ModuleNode] = {}
+
+
+class SymbolTable:
+    def __init__(
+        self, classes_lookup: Optional[Dict[str, str]] = None
+    ) -> None:
+        if classes_lookup is None:
+            classes_lookup = {}
+
+        # class name to name of the module defining the class
+        self.classes: Dict[str, str] = {}
+
+        # qualified hint names to known class names
+        self.names: Dict[str, Optional[str]] = {}
+
+        # prefix tree of the modules defining classes, built on demand
+        self.root: Optional[ModuleNode] = None
+
+        for class_name, module_name in classes_lookup.items():
+            self.add_class(class_name, module_name)
+
+    def add_class(self, class_name: str, module_name: str) -> None:
+        self.classes[class_name] = module_name
+
+        self.names.clear()
+
+        self.root = None
+
+    def module_of(self, class_name: str) -> Optional[str]:
+        return self.classes.get(class_name)
+
+    def lookup(self, name: str) -> Optional[str]:
+        # returns the class name for a possibly qualified name
+        # if the class is known
+        if name in self.names:
+            return self.names[name]
+
+        class_name: Optional[str] = name.split(".")[-1]
+
+        if class_name not in self.classes:
+            class_name = None
+
+        self.names[name] = class_name
+
+        return class_name
+
+    def submodules(self, module_name: str) -> List[str]:
+        # direct submodules of a module that define classes
+        if self.root is None:
+            self.root = ModuleNode()
+
+            for class_module_name in self.classes.values():
+                node = self.root
+
+                for part in class_module_name.split("."):
+                    if part not in node.children:
+                        node.children[part] = ModuleNode()
+
+                    node = node.children[part]
+
+        node = self.root
+
+        for part in module_name.split("."):
+            if part not in node.children:
+                return []
+
+            node = node.children[part]
+
+        return list(node.children)
+
+
+class Resolver:
+    def __init__(self, symbol_table: SymbolTable) -> None:
+        self.symbol_table = symbol_table
+
+        # resolved hints and the class names they reference
+        self.hints: Dict[Hint, Tuple[Hint, List[str]]] = {}
+
+    def resolve_hint(self, hint_instance: Hint) -> Tuple[Hint, List[str]]:
+        # returns the hint with known class names stripped of their module
+        # path and the class names it references in the order of get_hints
+        result = self.hints.get(hint_instance)
+
+        if result is None:
+            count("hint_resolutions")
+
+            name = hint_instance.name
+            class_names: List[str] = []
+
+            if name:
+                class_name = self.symbol_table.lookup(name)
+
+                if class_name is not None:
+                    # change hint to class name
+                    class_names.append(class_name)
+
+                    name = class_name
+
+            children: List[Hint] = []
+
+            for child in hint_instance.children:
+                child_hint, child_class_names = self.resolve_hint(child)
+
+                children.append(child_hint)
+                class_names.extend(child_class_names)
+
+            result = (Hint(name, children), class_names)
+
+            self.hints[hint_instance] = result
+
+        return result
+
+    def resolve_hints(self, module_instance: Module) -> List[str]:
+        # replaces the hints of the module and returns the class names
+        # they reference in the order they appear
+        result: List[str] = []
+
+        def update_hint(hint_instance: Hint) -> Hint:
+            resolved_hint, class_names = self.resolve_hint(hint_instance)
+
+            result.extend(class_names)
+
+            return resolved_hint
+
+        module_instance.replace_hints(update_hint)
+
+        return result
+
+    def resolve_imports(
+        self, module_instance: Module, class_names: List[str]
+    ) -> None:
+        import_names: Set[str] = {x.name for x in module_instance.imports}
+
+        def add_import(class_name: str) -> None:
+            count("import_resolutions")
+
+            class_module_name = self.symbol_table.classes[class_name]
+
+            if class_module_name != module_instance.name:
+                # add class module name to list of imports
+                # if class is from different module
+                if class_name not in import_names:
+                    import_names.add(class_name)
+
+                    module_instance.imports.append(
+                        Import(class_name, class_module_name)
+                    )
+
+        # update imports from type hints
+        for class_name in class_names:
+            add_import(class_name)
+
+        # update imports
+        if module_instance.name == "c4d":
+            import_names.add("*")
+
+            module_instance.imports.append(Import("*", "c4d.symbols"))
+
+        # update imports from direct submodules
+        for submodule_name in self.symbol_table.submodules(
+            module_instance.name
+        ):
+            import_names.add(submodule_name)
+
+            module_instance.imports.append(
+                Import(submodule_name, module_instance.name)
+            )
+
+        # update imports from class bases
+        for class_instance in module_instance.classes:
+            for index, base in enumerate(class_instance.bases):
+                class_name = self.symbol_table.lookup(base)
+
+                if class_name is not None:
+                    add_import(class_name)
+
+                    class_instance.bases[index] = class_name
+
+    def resolve_module(self, module_instance: Module) -> None:
+        self.resolve_imports(
+            module_instance, self.resolve_hints(module_instance)
+        )
+
+
+def resolve_modules(
+    modules: List[Module],
+    classes_lookup: Dict[str, str],
+    profiler: Optional[Profiler] = None,
+) -> None:
+    # the hints of all modules are resolved before their imports, which
+    # only depend on the class names of their own module, so both are
+    # timed apart
+    resolver = Resolver(SymbolTable(classes_lookup))
+
+    with profile_phase(profiler, "hints"):
+        class_names = [resolver.resolve_hints(x) for x in modules]
+
+    with profile_phase(profiler, "imports"):
+        for module_instance, module_class_names in zip(modules, class_names):
+            resolver.resolve_imports(module_instance, module_class_names)
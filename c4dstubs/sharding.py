@@ -0,0 +1,282 @@
+import io
+import re
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
+from c4dstubs.signatures import (
+    Argument,
+    Class,
+    Function,
+    Import,
+    Module,
+    Writer,
+    STUB_HEADER,
+)
+
+Member = Union[Argument, Class, Function]
+
+# blank lines after the imports, around the constants and before the
+# classes and functions of a module
+SECTION_SIZE = 5
+
+
+def shard_name(module_instance: Module, index: int) -> str:
+    # shards are private modules within the package of the module
+    if module_instance.is_init_file:
+        package_name = module_instance.name
+    else:
+        package_name = module_instance.module_path
+
+    name = f"_{module_instance.module_name}_{index}"
+
+    if package_name:
+        return f"{package_name}.{name}"
+
+    return name
+
+
+def shard_files(module_instance: Module, directory: Path) -> List[Path]:
+    # existing shard files of a module relative to the directory
+    package_path = Path(shard_name(module_instance, 0).replace(".", "/"))
+
+    pattern = re.compile(
+        re.escape(f"_{module_instance.module_name}_") + r"\d+\.pyi"
+    )
+
+    shard_directory = directory.joinpath(package_path.parent)
+
+    if not shard_directory.is_dir():
+        return []
+
+    return [
+        package_path.parent.joinpath(x.name)
+        for x in sorted(shard_directory.iterdir())
+        if pattern.fullmatch(x.name)
+    ]
+
+
+def member_size(member: Member, docstrings: str = "full") -> int:
+    # size of the member as rendered within a module
+    if isinstance(member, Argument):
+        return len(member.render()) + 1
+
+    stream = io.StringIO()
+
+    member.write(Writer(stream, docstrings=docstrings))
+
+    return len(stream.getvalue()) + 1
+
+
+def member_references(member: Member) -> List[str]:
+    # names the member refers to, classes are imported by these names
+    result = [x.name for x in member.get_hints() if x.name]
+
+    if isinstance(member, Class):
+        result.extend(member.bases)
+
+    return result
+
+
+def constant_prefix(constant_instance: Argument) -> str:
+    return constant_instance.name.split("_")[0]
+
+
+def group_members(
+    members: List[Member],
+    threshold: int,
+    docstrings: str = "full",
+    import_sizes: Optional[Dict[str, int]] = None,
+) -> List[List[Member]]:
+    # runs of constants with the same prefix are kept together as long
+    # as they fit, members are never reordered, the import sizes are
+    # charged for the classes a group uses without defining them
+    if import_sizes is None:
+        import_sizes = {}
+
+    def add_member(member: Member, names: Set[str]) -> int:
+        # size the member adds to a group that already has the names,
+        # the names it defines or imports are added
+        if isinstance(member, Class):
+            names.add(member.name)
+
+        result = member_size(member, docstrings)
+
+        for name in member_references(member):
+            if name in import_sizes and name not in names:
+                names.add(name)
+
+                result += import_sizes[name]
+
+        return result
+
+    runs: List[List[Member]] = []
+    previous_prefix = None
+
+    for member in members:
+        prefix = None
+
+        if isinstance(member, Argument):
+            prefix = constant_prefix(member)
+
+        if not runs or prefix is None or prefix != previous_prefix:
+            runs.append([])
+
+        runs[-1].append(member)
+
+        previous_prefix = prefix
+
+    result: List[List[Member]] = []
+    size = 0
+    names: Set[str] = set()
+
+    for run in runs:
+        run_names = set(names)
+        run_size = sum(add_member(x, run_names) for x in run)
+
+        if result and size + run_size <= threshold:
+            result[-1].extend(run)
+
+            size += run_size
+            names = run_names
+
+            continue
+
+        # split runs that do not fit into a shard of their own
+        result.append([])
+        size = 0
+        names = set()
+
+        for member in run:
+            member_names = set(names)
+            current_size = add_member(member, member_names)
+
+            if result[-1] and size + current_size > threshold:
+                result.append([])
+                size = 0
+
+                member_names = set()
+                current_size = add_member(member, member_names)
+
+            result[-1].append(member)
+
+            size += current_size
+            names = member_names
+
+    return result
+
+
+def shard_module(
+    module_instance: Module, threshold: int, docstrings: str = "full"
+) -> List[Module]:
+    # returns the public module followed by its shards,
+    # or the module itself if it does not exceed the threshold
+    members: List[Member] = [
+        *module_instance.constant_arguments(),
+        *module_instance.classes,
+        *module_instance.functions,
+    ]
+
+    # every shard repeats the header and the imports of the module, so
+    # the threshold is an upper bound of the size of its file
+    imports_size = len(
+        Module(
+            module_instance.name, imports=[*module_instance.imports]
+        ).render()
+    )
+
+    budget = threshold - len(STUB_HEADER) - imports_size - SECTION_SIZE
+
+    if sum(member_size(x, docstrings) for x in members) <= budget:
+        return [module_instance]
+
+    # a class imported from another shard takes at most a line of its own
+    longest_name = shard_name(module_instance, len(members))
+
+    import_sizes = {
+        x.name: len(f"from {longest_name} import {x.name}\n")
+        for x in module_instance.classes
+    }
+
+    groups = group_members(members, budget, docstrings, import_sizes)
+
+    if len(groups) < 2:
+        return [module_instance]
+
+    names = [shard_name(module_instance, x) for x in range(len(groups))]
+
+    # shard defining each class of the module
+    class_shards: Dict[str, str] = {}
+
+    for name, group in zip(names, groups):
+        for member in group:
+            if isinstance(member, Class):
+                class_shards[member.name] = name
+
+    shards: List[Module] = []
+
+    public_imports: List[Import] = [*module_instance.imports]
+
+    for name, group in zip(names, groups):
+        shard_instance = Module(
+            name,
+            imports=[*module_instance.imports],
+            constants=[x for x in group if isinstance(x, Argument)],
+            classes=[x for x in group if isinstance(x, Class)],
+            functions=[x for x in group if isinstance(x, Function)],
+        )
+
+        # import classes of the module defined in other shards
+        import_names: Set[str] = {x.name for x in shard_instance.imports}
+
+        for referenced_name in referenced_names(shard_instance):
+            class_shard = class_shards.get(referenced_name)
+
+            if class_shard and class_shard != name:
+                if referenced_name not in import_names:
+                    import_names.add(referenced_name)
+
+                    shard_instance.imports.append(
+                        Import(referenced_name, class_shard)
+                    )
+
+        # re-export the shard from the public module, private names
+        # are not part of star imports and must be imported explicitly
+        public_imports.append(Import("*", name))
+
+        for member in group:
+            if member.name.startswith("_"):
+                public_imports.append(Import(member.name, name, member.name))
+
+        shards.append(shard_instance)
+
+    public_instance = Module(
+        module_instance.name,
+        imports=public_imports,
+        is_init_file=module_instance.is_init_file,
+    )
+
+    return [public_instance, *shards]
+
+
+def referenced_names(module_instance: Module) -> List[str]:
+    result: List[str] = []
+
+    for hint_instance in module_instance.get_hints():
+        if hint_instance.name:
+            result.append(hint_instance.name)
+
+    for class_instance in module_instance.classes:
+        result.extend(class_instance.bases)
+
+    return result
+
+
+def shard_modules(
+    modules: List[Module], threshold: int, docstrings: str = "full"
+) -> List[Module]:
+    result: List[Module] = []
+
+    for module_instance in modules:
+        result.extend(shard_module(module_instance, threshold, docstrings))
+
+    return result
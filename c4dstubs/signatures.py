@@ -1,9 +1,98 @@
 from __future__ import annotations
 
-from typing import Optional, List, Generator
+import io
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Optional,
+    List,
+    Generator,
+    Iterable,
+    TextIO,
+    Tuple,
+    Union,
+)
+from c4dstubs.docstrings import DOCSTRING_POLICIES, DocstringField
+
+# written at the top of every stub
+STUB_HEADER = (
+    "from __future__ import annotations\n"
+    "from typing import List, Dict, Tuple, Union, Optional, Callable, Any, Iterable\n"
+    "\n"
+)
+
+
+def summarize_docstring(docstring: str) -> str:
+    # returns the docstring up to the end of its first paragraph
+    lines = docstring.split("\n")
+
+    start = 0
+
+    while start < len(lines) and not lines[start].strip():
+        start += 1
+
+    end = start
+
+    while end < len(lines) and lines[end].strip():
+        end += 1
+
+    return "\n".join(lines[:end])
+
+
+class Writer:
+    __slots__ = ("stream", "indentation", "prefix", "docstrings")
+
+    def __init__(
+        self,
+        stream: TextIO,
+        indentation: str = " " * 4,
+        docstrings: str = "full",
+    ) -> None:
+        if docstrings not in DOCSTRING_POLICIES:
+            raise ValueError(
+                f"Docstring policy must be one of {DOCSTRING_POLICIES}"
+                f" not '{docstrings}'"
+            )
+
+        self.stream = stream
+        self.indentation = indentation
+        self.prefix = ""
+        self.docstrings = docstrings
+
+    @contextmanager
+    def indent(self) -> Generator[None, None, None]:
+        prefix = self.prefix
+
+        self.prefix += self.indentation
+
+        try:
+            yield
+        finally:
+            self.prefix = prefix
+
+    def write(self, text: str) -> None:
+        self.stream.write(text)
+
+    def write_line(self, text: str = "") -> None:
+        # lines are always indented, even if they are empty
+        self.stream.write(self.prefix + text + "\n")
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        prefix = self.prefix
+
+        self.stream.writelines(prefix + x + "\n" for x in lines)
+
+    def newline(self) -> None:
+        self.stream.write("\n")
 
 
 class Signature:
+    __slots__ = ()
+
     @property
     def signature(self) -> str:
         return ""
@@ -17,30 +106,100 @@ class Signature:
 
 
 class Hint(Signature):
+    # structurally equal hints usually share one immutable instance, the
+    # hash is computed once and equality only compares the structure when
+    # the instances differ, so hints of different conversions still match
+    __slots__ = ("_name", "_children", "_signature", "_hash")
+
+    _instances: Dict[Tuple[Optional[str], Tuple[Hint, ...]], Hint] = {}
+
+    def __new__(
+        cls,
+        name: Optional[str] = None,
+        children: Optional[Iterable[Hint]] = None,
+    ) -> Hint:
+        key = (name, tuple(children) if children else ())
+
+        instance = cls._instances.get(key)
+
+        if instance is None:
+            instance = super().__new__(cls)
+
+            object.__setattr__(instance, "_name", key[0])
+            object.__setattr__(instance, "_children", key[1])
+            object.__setattr__(instance, "_signature", None)
+            object.__setattr__(instance, "_hash", hash(key))
+
+            cls._instances[key] = instance
+
+        return instance
+
     def __init__(
-        self, name: Optional[str] = None, children: Optional[List[Hint]] = None
+        self,
+        name: Optional[str] = None,
+        children: Optional[Iterable[Hint]] = None,
     ) -> None:
-        if children is None:
-            children = []
+        # initialized once by __new__
+        pass
 
-        self.name = name
-        self.children = children
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Hint is immutable, can not set '{name}'")
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+
+        if not isinstance(other, Hint):
+            return NotImplemented
+
+        return (
+            self._hash == other._hash
+            and self._name == other._name
+            and self._children == other._children
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    @classmethod
+    def clear_instances(cls) -> None:
+        # drops the interned hints when a conversion starts, so long running
+        # processes do not keep every hint they have seen, hints created
+        # before still equal the ones created after
+        cls._instances.clear()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # unpickled hints are interned again
+        return (Hint, (self._name, self._children))
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._name
+
+    @property
+    def children(self) -> Tuple[Hint, ...]:
+        return self._children
 
     @property
     def signature(self) -> str:
-        result = ""
+        result = self._signature
+
+        if result is None:
+            result = ""
+
+            if self.name:
+                result = self.name
 
-        if self.name:
-            result = self.name
+            if self.children:
+                # add children to signature
+                # if children exist
+                result += "["
 
-        if self.children:
-            # add children to signature
-            # if children exist
-            result += "["
+                result += ", ".join([x.signature for x in self.children])
 
-            result += ", ".join([x.signature for x in self.children])
+                result += "]"
 
-            result += "]"
+            object.__setattr__(self, "_signature", result)
 
         return result
 
@@ -59,6 +218,8 @@ class Hint(Signature):
 
 
 class Argument(Signature):
+    __slots__ = ("name", "hint", "default")
+
     def __init__(
         self, name: str, hint: Optional[Hint] = None, default: bool = False
     ) -> None:
@@ -93,14 +254,63 @@ class Argument(Signature):
     def get_hints(self) -> Generator[Hint, None, None]:
         yield from self.hint.get_hints()
 
+    def replace_hints(self, function: Callable[[Hint], Hint]) -> None:
+        self.hint = function(self.hint)
+
+
+class ConstantTable(Signature):
+    # constants sharing one hint, stored by name and rendered in bulk
+    __slots__ = ("names", "hint")
+
+    def __init__(self, names: List[str], hint: Optional[Hint] = None) -> None:
+        if hint is None:
+            hint = Hint("int")
+
+        self.names = names
+        self.hint = hint
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def arguments(self) -> List[Argument]:
+        return [Argument(x, self.hint, True) for x in self.names]
+
+    def lines(self) -> List[str]:
+        suffix = f": {self.hint.signature} = ..."
+
+        # self is rendered without hint like any other argument
+        return [x if x == "self" else x + suffix for x in self.names]
+
+    @property
+    def definition(self) -> str:
+        return "\n".join(self.lines())
+
+    def render(self) -> str:
+        return self.definition
+
+    def write(self, writer: Writer) -> None:
+        writer.write_lines(self.lines())
+
+    def get_hints(self) -> Generator[Hint, None, None]:
+        yield from self.hint.get_hints()
+
+    def replace_hints(self, function: Callable[[Hint], Hint]) -> None:
+        self.hint = function(self.hint)
+
+
+Constant = Union[Argument, ConstantTable]
+
 
 class Function(Signature):
+    __slots__ = ("name", "arguments", "return_hint", "docstring", "unresolved")
+
     def __init__(
         self,
         name: str,
         arguments: Optional[List[Argument]] = None,
         return_hint: Optional[Hint] = None,
         docstring: Optional[str] = None,
+        unresolved: Optional[List[DocstringField]] = None,
     ) -> None:
         if arguments is None:
             arguments = []
@@ -113,6 +323,9 @@ class Function(Signature):
         self.return_hint = return_hint
         self.docstring = docstring
 
+        # docstring fields whose hints could not be parsed
+        self.unresolved = unresolved
+
     @property
     def signature(self) -> str:
         result = "("
@@ -145,22 +358,33 @@ class Function(Signature):
     def definition(self) -> str:
         return f"def {self.name}{self.signature}"
 
-    def render(self) -> str:
-        result = f"{self.definition}:\n"
+    def write(self, writer: Writer) -> None:
+        writer.write_line(f"{self.definition}:")
 
-        if self.docstring:
-            result += " " * 4 + '"""'
+        docstring = self.docstring
 
-            for docstring_line in self.docstring.split("\n"):
-                result += " " * 4 + docstring_line + "\n"
+        if docstring and writer.docstrings == "summary":
+            docstring = summarize_docstring(docstring)
 
-            result += " " * 4 + '"""'
+        with writer.indent():
+            if docstring and writer.docstrings != "none":
+                docstring_lines = docstring.split("\n")
 
-            result += "\n"
+                # first line continues the opening quotes
+                writer.write_line('"""' + " " * 4 + docstring_lines[0])
 
-        result += " " * 4 + "...\n"
+                writer.write_lines(docstring_lines[1:])
 
-        return result
+                writer.write_line('"""')
+
+            writer.write_line("...")
+
+    def render(self) -> str:
+        stream = io.StringIO()
+
+        self.write(Writer(stream))
+
+        return stream.getvalue()
 
     def get_hints(self) -> Generator[Hint, None, None]:
         yield from self.return_hint.get_hints()
@@ -168,8 +392,16 @@ class Function(Signature):
         for argument in self.arguments:
             yield from argument.get_hints()
 
+    def replace_hints(self, function: Callable[[Hint], Hint]) -> None:
+        self.return_hint = function(self.return_hint)
+
+        for argument in self.arguments:
+            argument.replace_hints(function)
+
 
 class Class(Signature):
+    __slots__ = ("name", "bases", "attributes", "functions")
+
     def __init__(
         self,
         name: str,
@@ -206,40 +438,47 @@ class Class(Signature):
     def definition(self) -> str:
         return f"class {self.name}{self.signature}"
 
-    def render(self) -> str:
-        result = f"{self.definition}:\n"
+    def write(self, writer: Writer) -> None:
+        writer.write_line(f"{self.definition}:")
+
+        with writer.indent():
+            if self.attributes or self.functions:
+                if self.attributes:
+                    # add attributes to result
+                    writer.write_lines(x.render() for x in self.attributes)
+
+                    writer.newline()
+
+                for function_instance in self.functions:
+                    if function_instance.arguments:
+                        if function_instance.arguments[0].name == "cls":
+                            # function must be a class method
+                            # because the first arguments name is cls
+                            writer.write_line("@classmethod")
+
+                    if (
+                        not function_instance.arguments
+                        or function_instance.arguments[0].name != "self"
+                    ):
+                        # function must be a static method
+                        # because the first arguments name is not self
+                        # or because the function takes no arguments
+                        writer.write_line("@staticmethod")
+
+                    # append function to result followed by an indented
+                    # empty line
+                    function_instance.write(writer)
+
+                    writer.write_line()
+            else:
+                writer.write_line("...")
 
-        if self.attributes or self.functions:
-            if self.attributes:
-                # add attributes to result
-                for attribute_instance in self.attributes:
-                    result += " " * 4 + attribute_instance.render() + "\n"
+    def render(self) -> str:
+        stream = io.StringIO()
 
-                result += "\n"
+        self.write(Writer(stream))
 
-            for function_instance in self.functions:
-                if function_instance.arguments:
-                    if function_instance.arguments[0].name == "cls":
-                        # function must be a class method
-                        # because the first arguments name is cls
-                        result += " " * 4 + "@classmethod\n"
-
-                if (
-                    not function_instance.arguments
-                    or function_instance.arguments[0].name != "self"
-                ):
-                    # function must be a static method
-                    # because the first arguments name is not self
-                    # or because the function takes no arguments
-                    result += " " * 4 + "@staticmethod\n"
-
-                # append function to result
-                for function_line in function_instance.render().split("\n"):
-                    result += " " * 4 + function_line + "\n"
-        else:
-            result += " " * 4 + "...\n"
-
-        return result
+        return stream.getvalue()
 
     def get_hints(self) -> Generator[Hint, None, None]:
         for attribute in self.attributes:
@@ -247,3 +486,196 @@ class Class(Signature):
 
         for function in self.functions:
             yield from function.get_hints()
+
+    def replace_hints(self, function: Callable[[Hint], Hint]) -> None:
+        for attribute in self.attributes:
+            attribute.replace_hints(function)
+
+        for function_instance in self.functions:
+            function_instance.replace_hints(function)
+
+
+class Import:
+    __slots__ = ("name", "module", "alias")
+
+    def __init__(
+        self, name: str, module: str, alias: Optional[str] = None
+    ) -> None:
+        self.name = name
+        self.module = module
+
+        # name the symbol is bound to, stubs re-export names imported
+        # as themselves
+        self.alias = alias
+
+    def render(self) -> str:
+        if self.alias is None:
+            return self.name
+
+        return f"{self.name} as {self.alias}"
+
+
+class Module:
+    __slots__ = (
+        "name",
+        "imports",
+        "constants",
+        "classes",
+        "functions",
+        "is_init_file",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        imports: Optional[List[Import]] = None,
+        constants: Optional[List[Constant]] = None,
+        classes: Optional[List[Class]] = None,
+        functions: Optional[List[Function]] = None,
+        is_init_file: bool = False,
+    ) -> None:
+        if imports is None:
+            imports = []
+
+        if constants is None:
+            constants = []
+
+        if classes is None:
+            classes = []
+
+        if functions is None:
+            functions = []
+
+        self.name = name
+        self.imports = imports
+        self.constants = constants
+        self.classes = classes
+        self.functions = functions
+        self.is_init_file = is_init_file
+
+    @property
+    def module_name(self) -> str:
+        return self.name.split(".")[-1]
+
+    @property
+    def module_path(self) -> str:
+        return ".".join(self.name.split(".")[:-1])
+
+    @property
+    def constant_count(self) -> int:
+        return sum(
+            len(x) if isinstance(x, ConstantTable) else 1
+            for x in self.constants
+        )
+
+    def constant_arguments(self) -> List[Argument]:
+        # constants with tables expanded to arguments
+        result: List[Argument] = []
+
+        for constant_instance in self.constants:
+            if isinstance(constant_instance, ConstantTable):
+                result.extend(constant_instance.arguments())
+            else:
+                result.append(constant_instance)
+
+        return result
+
+    @property
+    def file_path(self) -> Path:
+        result = self.name.replace(".", "/")
+
+        if self.is_init_file:
+            result += "/__init__"
+
+        result += ".pyi"
+
+        return Path(result)
+
+    def get_hints(self) -> Generator[Hint, None, None]:
+        for constant_instance in self.constants:
+            yield from constant_instance.get_hints()
+
+        for class_instance in self.classes:
+            yield from class_instance.get_hints()
+
+        for function_instance in self.functions:
+            yield from function_instance.get_hints()
+
+    def replace_hints(self, function: Callable[[Hint], Hint]) -> None:
+        for constant_instance in self.constants:
+            constant_instance.replace_hints(function)
+
+        for class_instance in self.classes:
+            class_instance.replace_hints(function)
+
+        for function_instance in self.functions:
+            function_instance.replace_hints(function)
+
+    def write(self, writer: Writer) -> None:
+        # render imports
+        if self.imports:
+            grouped_imports: Dict[str, List[str]] = {}
+
+            for import_instance in self.imports:
+                if import_instance.module not in grouped_imports:
+                    grouped_imports[import_instance.module] = []
+
+                grouped_imports[import_instance.module].append(
+                    import_instance.render()
+                )
+
+            for key, value in grouped_imports.items():
+                if "*" in value and len(value) > 1:
+                    # star imports can not be combined with other names
+                    writer.write_line(f"from {key} import *")
+
+                    value = [x for x in value if x != "*"]
+
+                writer.write_line(f"from {key} import " + ", ".join(value))
+
+            writer.newline()
+
+        # render constants
+        if self.constants:
+            writer.newline()
+
+            arguments: List[Argument] = []
+
+            for constant_instance in self.constants:
+                if isinstance(constant_instance, ConstantTable):
+                    writer.write_lines(x.render() for x in arguments)
+
+                    arguments = []
+
+                    constant_instance.write(writer)
+                else:
+                    arguments.append(constant_instance)
+
+            writer.write_lines(x.render() for x in arguments)
+
+            writer.newline()
+
+        # render classes
+        if self.classes:
+            writer.newline()
+
+            for class_instance in self.classes:
+                class_instance.write(writer)
+
+                writer.newline()
+
+        # render functions
+        if self.functions:
+            writer.newline()
+
+            for function_instance in self.functions:
+                function_instance.write(writer)
+
+                writer.newline()
+
+    def render(self) -> str:
+        stream = io.StringIO()
+
+        self.write(Writer(stream))
+
+        return stream.getvalue()
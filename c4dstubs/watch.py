@@ -0,0 +1,432 @@
+import os
+import time
+import pickle
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from c4dstubs.signatures import Class, Constant, Function, Hint, Module
+from c4dstubs.parsers import parse_file
+from c4dstubs.parallel import (
+    collect_override_objects,
+    serialize_result,
+    deserialize_result,
+)
+from c4dstubs.resolver import resolve_modules
+from c4dstubs.sharding import shard_modules, shard_files
+from c4dstubs.files import StagedDirectory
+from c4dstubs.dependencies import DependencyGraph
+from c4dstubs.api import module_name_from_file_path, write_stub
+from c4dstubs.manifest import remove_build_manifest
+from c4dstubs.memo import hint_memo
+from c4dstubs.overrides import (
+    OverrideRegistry,
+    load_classes,
+    load_functions,
+    serialize_class,
+    serialize_function,
+)
+
+# modification time and size of a file
+FileSignature = Tuple[int, int]
+
+# kind and name of an override
+OverrideKey = Tuple[str, str]
+
+
+def file_signature(file: Path) -> Optional[FileSignature]:
+    try:
+        stat = file.stat()
+    except OSError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def scan_files(directory: Path) -> Dict[Path, FileSignature]:
+    # signatures of the files below the directory in the order of os.walk
+    result: Dict[Path, FileSignature] = {}
+
+    for root, _, filenames in os.walk(directory):
+        root_path = Path(root)
+
+        for filename in filenames:
+            file = root_path.joinpath(filename)
+            signature = file_signature(file)
+
+            if signature is not None:
+                result[file] = signature
+
+    return result
+
+
+def override_entries(
+    classes: List[Class], functions: List[Function]
+) -> Dict[OverrideKey, Any]:
+    # serialized form of every override to find the ones that changed
+    result: Dict[OverrideKey, Any] = {}
+
+    for class_instance in classes:
+        result[("class", class_instance.name)] = serialize_class(
+            class_instance
+        )
+
+    for function_instance in functions:
+        result[("function", function_instance.name)] = serialize_function(
+            function_instance
+        )
+
+    return result
+
+
+def keyed_override_objects(
+    classes: List[Class], functions: List[Function]
+) -> Dict[Tuple[str, str, int], Any]:
+    # override objects keyed by the override they belong to, unlike the
+    # indices of a traversal these keys stay valid for unchanged overrides
+    # when other overrides are added or removed
+    result: Dict[Tuple[str, str, int], Any] = {}
+
+    for kind, instances in (("class", classes), ("function", functions)):
+        for instance in instances:
+            for index, x in enumerate(
+                collect_override_objects([instance], [])
+            ):
+                result[(kind, instance.name, index)] = x
+
+    return result
+
+
+class ParsedFile:
+    __slots__ = ("data", "class_names", "override_keys")
+
+    def __init__(
+        self,
+        data: bytes,
+        class_names: List[str],
+        override_keys: Set[OverrideKey],
+    ) -> None:
+        # parse result serialized against the keyed override objects
+        self.data = data
+
+        # classes defined by the file in the order they are defined
+        self.class_names = class_names
+
+        # overrides the parse result depends on
+        self.override_keys = override_keys
+
+
+class Watcher:
+    # keeps the parse results of a package in memory and regenerates the
+    # stubs of the files affected by changes of the sources or overrides
+    def __init__(
+        self,
+        src_directory: Path,
+        destination_directory: Path,
+        classes_file: Path,
+        functions_file: Path,
+        cache_directory: Optional[Path] = None,
+        shard_size: Optional[int] = None,
+        docstrings: str = "full",
+    ) -> None:
+        self.src_directory = src_directory
+        self.destination_directory = destination_directory
+        self.classes_file = classes_file
+        self.functions_file = functions_file
+        self.cache_directory = cache_directory
+        self.shard_size = shard_size
+        self.docstrings = docstrings
+
+        self.signatures: Dict[Path, FileSignature] = {}
+
+        # source files in the order they are converted
+        self.files: List[Path] = []
+        self.parsed: Dict[Path, ParsedFile] = {}
+
+        # pickled overrides as loaded, every use gets a fresh copy since
+        # resolution modifies the hints of the objects it shares with them
+        self.overrides_data = pickle.dumps(([], []))
+        self.override_entries: Dict[OverrideKey, Any] = {}
+
+        self.dependencies = DependencyGraph()
+
+        # changes of a failed update that are applied with the next one
+        self.pending_files: Set[Path] = set()
+        self.pending_overrides = False
+
+    @property
+    def override_files(self) -> List[Path]:
+        return [self.classes_file, self.functions_file]
+
+    def scan(self) -> Dict[Path, FileSignature]:
+        result = scan_files(self.src_directory.joinpath("c4d"))
+
+        for file in self.override_files:
+            signature = file_signature(file)
+
+            if signature is not None:
+                result[file] = signature
+
+        return result
+
+    def load_overrides(self) -> Set[OverrideKey]:
+        # returns the keys of the overrides that changed
+        classes = load_classes(self.classes_file, self.cache_directory)
+        functions = load_functions(self.functions_file, self.cache_directory)
+
+        entries = override_entries(classes, functions)
+
+        result = {
+            x
+            for x in entries.keys() | self.override_entries.keys()
+            if entries.get(x) != self.override_entries.get(x)
+        }
+
+        self.overrides_data = pickle.dumps(
+            (classes, functions), pickle.HIGHEST_PROTOCOL
+        )
+        self.override_entries = entries
+
+        return result
+
+    def copy_overrides(
+        self,
+    ) -> Tuple[OverrideRegistry, Dict[Tuple[str, str, int], Any]]:
+        classes, functions = pickle.loads(self.overrides_data)
+
+        return (
+            OverrideRegistry(classes, functions),
+            keyed_override_objects(classes, functions),
+        )
+
+    def parse(self, files: List[Path]) -> None:
+        # overrides are not changed while parsing silently
+        # so the files can share one copy
+        overrides, objects = self.copy_overrides()
+
+        for file in files:
+            constants: List[Constant] = []
+            classes: List[Class] = []
+            functions: List[Function] = []
+
+            parse_file(file, constants, classes, functions, overrides, True)
+
+            override_keys = {("class", x.name) for x in classes}
+            override_keys.update(("function", x.name) for x in functions)
+
+            self.parsed[file] = ParsedFile(
+                serialize_result(
+                    (constants, classes, functions, [], []), objects
+                ),
+                [x.name for x in classes],
+                override_keys,
+            )
+
+            module_instance = self.module_of(file)
+
+            module_instance.constants = constants
+            module_instance.classes = classes
+            module_instance.functions = functions
+
+            self.dependencies.add_module(module_instance)
+
+    def module_of(self, file: Path) -> Module:
+        return Module(
+            module_name_from_file_path(file, self.src_directory),
+            is_init_file="__init__" in str(file),
+        )
+
+    def load_modules(self, files: List[Path]) -> List[Module]:
+        _, objects = self.copy_overrides()
+
+        result: List[Module] = []
+
+        for file in files:
+            constants, classes, functions, _, _ = deserialize_result(
+                self.parsed[file].data, objects
+            )
+
+            module_instance = self.module_of(file)
+
+            module_instance.constants = constants
+            module_instance.classes = classes
+            module_instance.functions = functions
+
+            result.append(module_instance)
+
+        return result
+
+    def update(
+        self,
+        changed_files: Set[Path],
+        removed_files: Set[Path],
+        overrides_changed: bool,
+    ) -> Tuple[int, int]:
+        # returns the number of rendered and of changed stub files
+        changed_keys: Set[OverrideKey] = set()
+
+        if overrides_changed:
+            changed_keys = self.load_overrides()
+
+        self.files = [
+            x for x in self.signatures if x not in self.override_files
+        ]
+
+        for file in removed_files:
+            self.parsed.pop(file, None)
+
+            self.dependencies.remove_module(self.module_of(file).name)
+
+        # files defining changed overrides are parsed again
+        parse_files = {x for x in changed_files if x not in removed_files}
+
+        for file, parsed_file in self.parsed.items():
+            if parsed_file.override_keys & changed_keys:
+                parse_files.add(file)
+
+        self.parse([x for x in self.files if x in parse_files])
+
+        classes_lookup: Dict[str, str] = {"UUID": "uuid"}
+
+        for file in self.files:
+            module_name = module_name_from_file_path(file, self.src_directory)
+
+            for class_name in self.parsed[file].class_names:
+                classes_lookup[class_name] = module_name
+
+        # modules depending on classes that were added, removed or moved
+        affected_modules = self.dependencies.update_classes(classes_lookup)
+
+        render_files = parse_files | {
+            x
+            for x in self.files
+            if module_name_from_file_path(x, self.src_directory)
+            in affected_modules
+        }
+
+        modules = self.load_modules(
+            [x for x in self.files if x in render_files]
+        )
+
+        resolve_modules(modules, classes_lookup)
+
+        output_modules = modules
+
+        if self.shard_size:
+            output_modules = shard_modules(
+                modules, self.shard_size, self.docstrings
+            )
+
+        with StagedDirectory(self.destination_directory) as staged_directory:
+            for module_instance in output_modules:
+                staged_directory.write(
+                    module_instance.file_path,
+                    lambda f: write_stub(f, module_instance, self.docstrings),
+                )
+
+            # remove stubs of removed files and shards that are not
+            # written anymore
+            for module_instance in [
+                *modules,
+                *[self.module_of(x) for x in removed_files],
+            ]:
+                for file in shard_files(
+                    module_instance, self.destination_directory
+                ):
+                    staged_directory.remove(file)
+
+            for file in removed_files:
+                staged_directory.remove(self.module_of(file).file_path)
+
+        for file in staged_directory.changed_files:
+            print(f"Updated {file}")
+
+        return (len(output_modules), len(staged_directory.changed_files))
+
+    def build(self) -> Tuple[int, int]:
+        # stubs are updated without a manifest, so runs after watching
+        # convert again
+        remove_build_manifest(self.destination_directory)
+
+        # hints of earlier conversions in this process are dropped
+        Hint.clear_instances()
+        hint_memo.clear()
+
+        self.signatures = self.scan()
+
+        return self.update(set(self.signatures), set(), True)
+
+    def poll(self) -> Optional[Tuple[int, int]]:
+        # updates the stubs if any of the watched files changed
+        signatures = self.scan()
+
+        if signatures == self.signatures:
+            return None
+
+        changed_files = {
+            x for x, y in signatures.items() if self.signatures.get(x) != y
+        }
+        removed_files = self.signatures.keys() - signatures.keys()
+
+        self.signatures = signatures
+
+        overrides_changed = self.pending_overrides or any(
+            x in changed_files or x in removed_files
+            for x in self.override_files
+        )
+
+        changed_files.update(self.pending_files)
+
+        try:
+            result = self.update(
+                changed_files - set(self.override_files),
+                removed_files - set(self.override_files),
+                overrides_changed,
+            )
+        except Exception:
+            self.pending_files = changed_files | removed_files
+            self.pending_overrides = overrides_changed
+
+            if overrides_changed:
+                # overrides may have been loaded without parsing the files
+                # that depend on them, so all files are parsed again
+                self.override_entries = {}
+
+            raise
+
+        self.pending_files = set()
+        self.pending_overrides = False
+
+        return result
+
+    def run(self, interval: float = 0.5) -> None:
+        start = time.perf_counter()
+
+        rendered, changed = self.build()
+
+        print(
+            f"Rendered {rendered} modules, updated {changed}"
+            f" in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+
+        print(f"Watching {self.src_directory} for changes")
+
+        while True:
+            time.sleep(interval)
+
+            start = time.perf_counter()
+
+            try:
+                result = self.poll()
+            except Exception as e:
+                # keep watching, the next change may fix the error
+                print(f"Update failed: {e}")
+
+                continue
+
+            if result is not None:
+                rendered, changed = result
+
+                print(
+                    f"Rendered {rendered} modules, updated {changed}"
+                    f" in {(time.perf_counter() - start) * 1000:.0f} ms"
+                )
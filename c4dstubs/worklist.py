@@ -0,0 +1,289 @@
+import yaml
+
+from pathlib import Path
+from typing import Any, Dict, Generator, List, Optional, Set, Tuple
+from c4dstubs.signatures import Argument, Function, Hint, Module
+from c4dstubs.docstrings import DocstringField
+from c4dstubs.parsers import parse_hint
+from c4dstubs.memo import HintMemo, hint_memo
+from c4dstubs.profiling import count
+from c4dstubs.files import write_if_changed
+
+# use libyaml if available
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper  # type: ignore
+
+# occurrences listed per hint when asking for an answer
+PROMPT_OCCURRENCES = 3
+
+
+def module_functions(
+    module_instance: Module,
+) -> Generator[Tuple[str, Function], None, None]:
+    # qualified names and functions and methods of a module
+    for function_instance in module_instance.functions:
+        yield (function_instance.name, function_instance)
+
+    for class_instance in module_instance.classes:
+        for function_instance in class_instance.functions:
+            yield (
+                f"{class_instance.name}.{function_instance.name}",
+                function_instance,
+            )
+
+
+def hint_error(hint: str, memo: Optional[HintMemo] = None) -> Optional[str]:
+    # message of the error parsing the hint or None if it can be parsed
+    try:
+        parse_hint(hint, memo)
+    except Exception as e:
+        return str(e)
+
+    return None
+
+
+def apply_hint(
+    function_instance: Function, field: DocstringField, hint_instance: Hint
+) -> None:
+    if field.kind == "rtype":
+        function_instance.return_hint = hint_instance
+
+        return
+
+    # the first argument of a name is documented
+    argument_instance: Optional[Argument] = None
+
+    for x in function_instance.arguments:
+        if x.name == field.name:
+            argument_instance = x
+
+            break
+
+    if argument_instance is None:
+        return
+
+    if argument_instance.default and argument_instance.hint.name == "Optional":
+        # keep arguments described as optional wrapped in Optional
+        if hint_instance.name != "Optional":
+            hint_instance = Hint("Optional", [hint_instance])
+
+    argument_instance.hint = hint_instance
+
+
+class WorklistEntry:
+    __slots__ = ("hint", "error", "answer", "occurrences")
+
+    def __init__(
+        self,
+        hint: str,
+        error: Optional[str] = None,
+        answer: Optional[str] = None,
+    ) -> None:
+        # raw hint of the docstring and the error parsing it
+        self.hint = hint
+        self.error = error
+
+        # hint to use instead, None until answered
+        self.answer = answer
+
+        # module, function, argument and docstring line of every use
+        self.occurrences: List[Dict[str, str]] = []
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            "hint": self.hint,
+            "error": self.error,
+            "answer": self.answer,
+            "occurrences": self.occurrences,
+        }
+
+
+class Worklist:
+    # unparsable docstring hints are collected while converting silently
+    # and answered in one batch, answers are kept in the worklist file
+    # and applied to the parsed functions of later runs, while converting
+    # they are stored in the answers of the memo
+    def __init__(
+        self,
+        memo: Optional[HintMemo] = None,
+        interactive: bool = False,
+    ) -> None:
+        if memo is None:
+            memo = hint_memo
+
+        self.memo = memo
+
+        # whether unanswered hints are asked for once parsing is done
+        self.interactive = interactive
+        self.entries: Dict[str, WorklistEntry] = {}
+
+        # names of the modules whose hints have been recorded
+        self.modules: Set[str] = set()
+
+        # parsed answers, None for answers that can not be parsed
+        self.hints: Dict[str, Optional[Hint]] = {}
+
+    @property
+    def answers(self) -> Dict[str, str]:
+        return self.memo.answers
+
+    @property
+    def answered_count(self) -> int:
+        return sum(1 for x in self.entries.values() if x.answer is not None)
+
+    def record(self, module_instance: Module) -> None:
+        # modules converted again are recorded once
+        if module_instance.name in self.modules:
+            return
+
+        self.modules.add(module_instance.name)
+
+        for function_name, function_instance in module_functions(
+            module_instance
+        ):
+            for field in function_instance.unresolved or []:
+                entry = self.entries.get(field.text)
+
+                if entry is None:
+                    entry = WorklistEntry(
+                        field.text,
+                        hint_error(field.text, self.memo),
+                        self.answers.get(field.text),
+                    )
+
+                    self.entries[field.text] = entry
+
+                entry.occurrences.append(
+                    {
+                        "module": module_instance.name,
+                        "function": function_name,
+                        "argument": field.name or "return",
+                        "line": field.source.strip(),
+                    }
+                )
+
+    def apply(self, module_instance: Module) -> int:
+        # replaces the hints of answered fields, returns their number
+        result = 0
+
+        for _, function_instance in module_functions(module_instance):
+            for field in function_instance.unresolved or []:
+                hint_instance = self.answer_hint(field.text)
+
+                if hint_instance is None:
+                    continue
+
+                apply_hint(function_instance, field, hint_instance)
+
+                count("worklist_answers")
+
+                result += 1
+
+        return result
+
+    def update(self, modules: List[Module]) -> int:
+        # records the hints of all modules, asks for unanswered ones in
+        # interactive mode and applies the answers, returns their number
+        for module_instance in modules:
+            self.record(module_instance)
+
+        if self.interactive:
+            self.ask()
+
+        return sum(self.apply(x) for x in modules)
+
+    def answer_hint(self, hint: str) -> Optional[Hint]:
+        if hint in self.hints:
+            return self.hints[hint]
+
+        result: Optional[Hint] = None
+        answer = self.answers.get(hint)
+
+        if answer is not None:
+            try:
+                result = parse_hint(answer, self.memo)
+            except Exception as e:
+                print(f"Invalid answer for '{hint}': {e}")
+
+        self.hints[hint] = result
+
+        return result
+
+    def ask(self) -> int:
+        # asks for the hints of unanswered entries in one session,
+        # returns the number of new answers, empty answers skip a hint
+        result = 0
+
+        for entry in self.entries.values():
+            if entry.answer is not None:
+                continue
+
+            print(f"Unresolved hint '{entry.hint}': {entry.error}")
+
+            for occurrence in entry.occurrences[:PROMPT_OCCURRENCES]:
+                print(
+                    f"  {occurrence['module']}.{occurrence['function']}"
+                    f" ({occurrence['argument']}): {occurrence['line']}"
+                )
+
+            if len(entry.occurrences) > PROMPT_OCCURRENCES:
+                print(
+                    f"  and {len(entry.occurrences) - PROMPT_OCCURRENCES}"
+                    " more"
+                )
+
+            while True:
+                try:
+                    answer = input("Override with: ").strip()
+                except EOFError:
+                    # the remaining hints stay unanswered
+                    return result
+
+                if not answer:
+                    break
+
+                error = hint_error(answer, self.memo)
+
+                if error is None:
+                    entry.answer = answer
+
+                    self.memo.add_answer(entry.hint, answer)
+
+                    result += 1
+
+                    break
+
+                print(error)
+
+        return result
+
+    def save(self, file: Path) -> bool:
+        # hints that are not used anymore are dropped with their answers
+        return write_if_changed(
+            file,
+            yaml.dump(  # type: ignore
+                [x.serialize() for x in self.entries.values()],
+                Dumper=SafeDumper,
+                width=1000,
+                sort_keys=False,
+            ),
+        )
+
+    @classmethod
+    def load(cls, file: Path, memo: Optional[HintMemo] = None) -> "Worklist":
+        # answers of the file are added to the memo
+        result = cls(memo)
+
+        if not file.is_file():
+            return result
+
+        with open(file, "r") as f:
+            data = yaml.load(f, Loader=SafeLoader)
+
+        for item in data or []:
+            if item.get("answer") is not None:
+                result.memo.add_answer(item["hint"], str(item["answer"]))
+
+        return result